@@ -0,0 +1,542 @@
+import jit
+from instructions import NZ_TABLE, setNZ, setNZC, addWithCarry
+
+
+# Instruction size of each addressing mode, matched against the handler names
+INSTRUCTION_SIZE = {'Implied': 1,
+                    'Accumulator': 1,
+                    'Immediate': 2,
+                    'Relative': 2,
+                    'Zero': 2,
+                    'Zero_X': 2,
+                    'Zero_Y': 2,
+                    'Indirect_X': 2,
+                    'Indirect_Y': 2,
+                    'Absolute': 3,
+                    'Absolute_X': 3,
+                    'Absolute_Y': 3,
+                    'Indirect': 3}
+
+# Instructions that may change the flow of control close a block
+BLOCK_END = ('BCC', 'BCS', 'BEQ', 'BMI', 'BNE', 'BPL', 'BVC', 'BVS',
+             'BRK', 'JMP', 'JSR', 'RTI', 'RTS')
+
+# Keeps scanline and interrupt checks from drifting too far on long runs
+MAX_BLOCK_SIZE = 32
+
+
+# Operand bound instructions. Each one is decoded once into a function that
+# runs it without fetching anything or counting cycles; the block knows both.
+# They leave the PC alone, except for the branches, which set it when taken
+# and return the extra cycles.
+
+# Address of the operand of a memory instruction
+def operandAddress(cpu, mode, operand):
+    RAM = cpu.RAM
+    if mode in ('Zero', 'Absolute'):
+        return lambda: operand
+    if mode == 'Zero_X':
+        return lambda: (operand + cpu.X) & 0xFF
+    if mode == 'Zero_Y':
+        return lambda: (operand + cpu.Y) & 0xFF
+    if mode == 'Absolute_X':
+        return lambda: (operand + cpu.X) & 0xFFFF
+    if mode == 'Absolute_Y':
+        return lambda: (operand + cpu.Y) & 0xFFFF
+    if mode == 'Indirect_X':
+        def address():
+            pointer = (operand + cpu.X) & 0xFF
+            return RAM[pointer] | (RAM[(pointer + 1) & 0xFF] << 8)
+        return address
+    high = (operand + 1) & 0xFF
+    return lambda: ((RAM[operand] | (RAM[high] << 8)) + cpu.Y) & 0xFFFF
+
+
+# Value of the operand of a reading instruction. RAM is indexed directly and
+# PRG, which never changes, is read while decoding.
+def operandValue(cpu, mode, operand):
+    RAM = cpu.RAM
+    read = cpu.readMemory
+    if mode == 'Immediate':
+        return lambda: operand
+    if mode == 'Zero':
+        return lambda: RAM[operand]
+    if mode == 'Zero_X':
+        return lambda: RAM[(operand + cpu.X) & 0xFF]
+    if mode == 'Zero_Y':
+        return lambda: RAM[(operand + cpu.Y) & 0xFF]
+    if mode == 'Absolute':
+        if operand < 0x2000:
+            index = operand & 0x7FF
+            return lambda: RAM[index]
+        if operand >= 0x8000:
+            value = read(operand)
+            return lambda: value
+        return lambda: read(operand)
+    address = operandAddress(cpu, mode, operand)
+    return lambda: read(address())
+
+
+def bindLDA(cpu, value):
+    def op():
+        cpu.A = v = value()
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindLDX(cpu, value):
+    def op():
+        cpu.X = v = value()
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindLDY(cpu, value):
+    def op():
+        cpu.Y = v = value()
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindAND(cpu, value):
+    def op():
+        cpu.A = v = cpu.A & value()
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindORA(cpu, value):
+    def op():
+        cpu.A = v = cpu.A | value()
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindEOR(cpu, value):
+    def op():
+        cpu.A = v = cpu.A ^ value()
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindADC(cpu, value):
+    return lambda: addWithCarry(cpu, value())
+
+
+def bindSBC(cpu, value):
+    return lambda: addWithCarry(cpu, value() ^ 0xFF)
+
+
+def bindCMP(cpu, value):
+    return lambda: setNZC(cpu, cpu.A + 0x100 - value())
+
+
+def bindCPX(cpu, value):
+    return lambda: setNZC(cpu, cpu.X + 0x100 - value())
+
+
+def bindCPY(cpu, value):
+    return lambda: setNZC(cpu, cpu.Y + 0x100 - value())
+
+
+def bindBIT(cpu, value):
+    def op():
+        v = value()
+        cpu.P = (cpu.P & 0x3D) | (v & 0xC0) | NZ_TABLE[v & cpu.A] & 0x02
+    return op
+
+
+READS = {'LDA': bindLDA, 'LDX': bindLDX, 'LDY': bindLDY,
+         'AND': bindAND, 'ORA': bindORA, 'EOR': bindEOR,
+         'ADC': bindADC, 'SBC': bindSBC,
+         'CMP': bindCMP, 'CPX': bindCPX, 'CPY': bindCPY,
+         'BIT': bindBIT}
+
+STORES = ('STA', 'STX', 'STY')
+
+
+# Read-modify-write instructions, as the new value of the operand given the
+# old one. They set the flags.
+def shiftLeft(cpu, value):
+    value <<= 1
+    setNZC(cpu, value)
+    return value & 0xFF
+
+
+def shiftRight(cpu, value):
+    setNZC(cpu, ((value & 0x01) << 8) | (value >> 1))
+    return value >> 1
+
+
+def rotateLeft(cpu, value):
+    value = (value << 1) | (cpu.P & 0x01)
+    setNZC(cpu, value)
+    return value & 0xFF
+
+
+def rotateRight(cpu, value):
+    result = (value >> 1) | ((cpu.P & 0x01) << 7)
+    setNZC(cpu, ((value & 0x01) << 8) | result)
+    return result
+
+
+def increment(cpu, value):
+    value = (value + 1) & 0xFF
+    setNZ(cpu, value)
+    return value
+
+
+def decrement(cpu, value):
+    value = (value - 1) & 0xFF
+    setNZ(cpu, value)
+    return value
+
+
+MODIFIES = {'ASL': shiftLeft, 'LSR': shiftRight, 'ROL': rotateLeft, 'ROR': rotateRight,
+            'INC': increment, 'DEC': decrement}
+
+
+def bindINX(cpu):
+    def op():
+        cpu.X = v = (cpu.X + 1) & 0xFF
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindINY(cpu):
+    def op():
+        cpu.Y = v = (cpu.Y + 1) & 0xFF
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindDEX(cpu):
+    def op():
+        cpu.X = v = (cpu.X - 1) & 0xFF
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindDEY(cpu):
+    def op():
+        cpu.Y = v = (cpu.Y - 1) & 0xFF
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindTAX(cpu):
+    def op():
+        cpu.X = v = cpu.A
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindTAY(cpu):
+    def op():
+        cpu.Y = v = cpu.A
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindTXA(cpu):
+    def op():
+        cpu.A = v = cpu.X
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindTYA(cpu):
+    def op():
+        cpu.A = v = cpu.Y
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindTSX(cpu):
+    def op():
+        cpu.X = v = cpu.SP
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindTXS(cpu):
+    def op():
+        cpu.SP = cpu.X
+    return op
+
+
+def bindPHA(cpu):
+    return lambda: cpu.pushStack(cpu.A)
+
+
+def bindPHP(cpu):
+    return lambda: cpu.pushStack(cpu.P)
+
+
+def bindPLA(cpu):
+    def op():
+        cpu.A = v = cpu.pullStack()
+        cpu.P = (cpu.P & 0x7D) | NZ_TABLE[v]
+    return op
+
+
+def bindPLP(cpu):
+    def op():
+        cpu.P = (cpu.pullStack() & 0xEF) | 0x20
+    return op
+
+
+def bindNOP(cpu):
+    return lambda: None
+
+
+# Bits cleared and set in P
+FLAGS = {'CLC': (0xFE, 0x00), 'SEC': (0xFF, 0x01),
+         'CLI': (0xFB, 0x00), 'SEI': (0xFF, 0x04),
+         'CLD': (0xF7, 0x00), 'SED': (0xFF, 0x08),
+         'CLV': (0xBF, 0x00)}
+
+
+def bindFlag(cpu, keep, set):
+    def op():
+        cpu.P = (cpu.P & keep) | set
+    return op
+
+
+IMPLIED = {'INX': bindINX, 'INY': bindINY, 'DEX': bindDEX, 'DEY': bindDEY,
+           'TAX': bindTAX, 'TAY': bindTAY, 'TXA': bindTXA, 'TYA': bindTYA,
+           'TSX': bindTSX, 'TXS': bindTXS,
+           'PHA': bindPHA, 'PHP': bindPHP, 'PLA': bindPLA, 'PLP': bindPLP,
+           'NOP': bindNOP}
+
+# Flag tested and the value it has when the branch is taken
+BRANCHES = {'BCC': (0x01, 0x00), 'BCS': (0x01, 0x01),
+            'BNE': (0x02, 0x00), 'BEQ': (0x02, 0x02),
+            'BPL': (0x80, 0x00), 'BMI': (0x80, 0x80),
+            'BVC': (0x40, 0x00), 'BVS': (0x40, 0x40)}
+
+
+def bindBranch(cpu, pc, operand, flag, taken):
+    offset = operand - 0x100 if operand & 0x80 else operand
+    # Left unmasked, like the handler does
+    target = pc + offset + 2
+    extra = 2 if (pc & 0xFF00) != ((pc + offset) & 0xFF00) else 1
+
+    def op():
+        if cpu.P & flag == taken:
+            cpu.PC = target
+            return extra
+        return 0
+    return op
+
+
+# Anything else runs through its handler, from its own address
+def bindHandler(cpu, pc, handler):
+    def op():
+        cpu.PC = pc
+        handler()
+    return op
+
+
+def bind(cpu, pc, opcode, operand, mnemonic, mode):
+    if mnemonic in READS:
+        return READS[mnemonic](cpu, operandValue(cpu, mode, operand))
+    if mnemonic in STORES:
+        address = operandAddress(cpu, mode, operand)
+        write = cpu.writeMemory
+        if mnemonic == 'STA':
+            return lambda: write(address(), cpu.A)
+        if mnemonic == 'STX':
+            return lambda: write(address(), cpu.X)
+        return lambda: write(address(), cpu.Y)
+    if mnemonic in MODIFIES and mode != 'Implied':
+        modify = MODIFIES[mnemonic]
+        if mode == 'Accumulator':
+            def op():
+                cpu.A = modify(cpu, cpu.A)
+            return op
+        address = operandAddress(cpu, mode, operand)
+        read = cpu.readMemory
+        write = cpu.writeMemory
+
+        def op():
+            a = address()
+            write(a, modify(cpu, read(a)))
+        return op
+    if mode == 'Implied':
+        if mnemonic in IMPLIED:
+            return IMPLIED[mnemonic](cpu)
+        if mnemonic in FLAGS:
+            return bindFlag(cpu, *FLAGS[mnemonic])
+    if mnemonic in BRANCHES:
+        return bindBranch(cpu, pc, operand, *BRANCHES[mnemonic])
+    return bindHandler(cpu, pc, cpu.opcodes[opcode])
+
+
+class BlockCache:
+    class Block:
+        __slots__ = ('start', 'end', 'ops', 'body', 'last', 'code', 'costs', 'cycles', 'lead',
+                     'valid', 'entries', 'compiled')
+
+        def __init__(self, start, end, ops, code):
+            self.start = start
+            self.end = end
+            self.ops = ops
+            self.body = ops[:-1]
+            self.last = ops[-1]
+            # (pc, opcode, operand, size) for every instruction in the block
+            self.code = code
+            # Cycles of each instruction and of the whole block, without the
+            # branch penalty. The last instruction starts lead cycles in.
+            self.costs = tuple(jit.CYCLES[opcode] for pc, opcode, operand, size in code)
+            self.cycles = sum(self.costs)
+            self.lead = self.cycles - self.costs[-1]
+            self.valid = True
+            self.entries = 0
+            self.compiled = None
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self.blocks = {}
+
+        # Blocks decoded from RAM, per physical 256 byte page, and the bus
+        # write entries replaced while a page holds code.
+        self.ramBlocks = [[] for _ in range(8)]
+        self.ramWritePages = {}
+        # Non zero for the physical RAM pages holding code
+        self.codePages = bytearray(8)
+
+        # Set when hot blocks should be compiled
+        self.compiler = None
+
+        # (mnemonic, size) of each opcode, None where the interpreter must
+        # handle it alone, and the addressing modes
+        self.decodeTable = [None] * 0x100
+        self.modes = [None] * 0x100
+        for opcode, handler in cpu.instructions.items():
+            mnemonic, mode = handler.__name__.split('_', 1)
+            self.decodeTable[opcode] = (mnemonic, INSTRUCTION_SIZE[mode])
+            self.modes[opcode] = mode
+
+    # Runs the block at the PC, stopping once budget cycles have gone by, the
+    # same instruction the interpreter would stop at. Returns the cycles
+    # consumed.
+    def execute(self, budget):
+        cpu = self.cpu
+        block = self.blocks.get(cpu.PC)
+        if block is None:
+            block = self.decode(cpu.PC)
+            if block is None:
+                return cpu.opcodes[cpu.readMemory(cpu.PC)]()
+
+        whole = block.lead < budget
+        if block.compiled is not None:
+            if whole:
+                return block.compiled()
+        elif self.compiler is not None:
+            block.entries += 1
+            if block.entries >= jit.JIT_THRESHOLD:
+                block.compiled = self.compiler.compile(block)
+                if whole:
+                    return block.compiled()
+
+        if whole and block.start >= 0x8000:
+            for op in block.body:
+                op()
+            cpu.PC = block.end
+            return block.cycles + (block.last() or 0)
+
+        # One instruction at a time. Code in RAM can also rewrite itself mid
+        # block.
+        cycles = 0
+        costs = block.costs
+        for index, op in enumerate(block.body):
+            op()
+            cycles += costs[index]
+            if cycles >= budget or not block.valid:
+                cpu.PC = block.code[index + 1][0]
+                return cycles
+        cpu.PC = block.end
+        return block.cycles + (block.last() or 0)
+
+    def decode(self, pc):
+        # Only RAM and PRG hold code, anything else is left to the interpreter
+        if 0x2000 <= pc < 0x8000:
+            return None
+
+        cpu = self.cpu
+        read = cpu.readMemory
+        ops = []
+        code = []
+        address = pc
+        while len(ops) < MAX_BLOCK_SIZE:
+            opcode = read(address)
+            decoded = self.decodeTable[opcode]
+            if decoded is None:
+                break
+            mnemonic, size = decoded
+            # RAM blocks stay inside one 2KB mirror, so they map onto a
+            # contiguous run of physical pages
+            end = address + size
+            if end > 0x10000 or (pc < 0x2000 and (end - 1) >> 11 != pc >> 11):
+                break
+            if size == 1:
+                operand = None
+            elif size == 2:
+                operand = read(address + 1)
+            else:
+                operand = cpu.fetchWord(address + 1)
+            ops.append(bind(cpu, address, opcode, operand, mnemonic, self.modes[opcode]))
+            code.append((address, opcode, operand, size))
+            address = end
+            if mnemonic in BLOCK_END:
+                break
+
+        if not ops:
+            return None
+
+        block = self.Block(pc, address, tuple(ops), tuple(code))
+        self.blocks[pc] = block
+        if pc < 0x2000:
+            self.watchRAM(block)
+        return block
+
+    def watchRAM(self, block):
+        bus = self.cpu.bus
+        first = (block.start & 0x7FF) >> 8
+        last = ((block.end - 1) & 0x7FF) >> 8
+        for page in range(first, last + 1):
+            self.ramBlocks[page].append(block)
+            self.codePages[page] = 1
+            if page in self.ramWritePages:
+                continue
+            mirrors = range(page, 0x20, 0x08)
+            self.ramWritePages[page] = [bus.writePages[mirror] for mirror in mirrors]
+            for mirror in mirrors:
+                bus.writePages[mirror] = bus.HandlerPage(mirror << 8, None, self.writeCode)
+
+    def writeCode(self, address, value):
+        address &= 0x7FF
+        self.cpu.RAM[address] = value
+        page = address >> 8
+
+        stale = [block for block in self.ramBlocks[page]
+                 if (block.start & 0x7FF) <= address < (block.start & 0x7FF) + (block.end - block.start)]
+        for block in stale:
+            self.invalidate(block)
+
+    def invalidate(self, block):
+        block.valid = False
+        if self.blocks.get(block.start) is block:
+            del self.blocks[block.start]
+
+        bus = self.cpu.bus
+        first = (block.start & 0x7FF) >> 8
+        last = ((block.end - 1) & 0x7FF) >> 8
+        for page in range(first, last + 1):
+            self.ramBlocks[page].remove(block)
+            # Give the page its direct write path back once it holds no code
+            if not self.ramBlocks[page]:
+                self.codePages[page] = 0
+                for mirror, view in zip(range(page, 0x20, 0x08), self.ramWritePages.pop(page)):
+                    bus.writePages[mirror] = view
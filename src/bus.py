@@ -0,0 +1,48 @@
+class MemoryBus:
+    # Stands in for a backing buffer on pages that need side effects. Both
+    # handlers receive the full 16-bit address.
+    class HandlerPage:
+        __slots__ = ('base', 'read', 'write')
+
+        def __init__(self, base, read, write):
+            self.base = base
+            self.read = read
+            self.write = write
+
+        def __getitem__(self, offset):
+            return self.read(self.base | offset)
+
+        def __setitem__(self, offset, value):
+            self.write(self.base | offset, value)
+
+    def __init__(self):
+        # One entry per 256-byte page, either a memoryview over the backing
+        # buffer or a HandlerPage, so every access is a single double index.
+        self.readPages = [None] * 0x100
+        self.writePages = [None] * 0x100
+
+    # Maps pages first..last onto buffer. A buffer smaller than the range is
+    # repeated, which is how the RAM and single bank PRG mirrors are built.
+    def mapMemory(self, first, last, buffer, writable=True):
+        memory = memoryview(buffer)
+        size = len(memory)
+        for page in range(first, last + 1):
+            offset = ((page - first) << 8) % size
+            view = memory[offset:offset + 0x100]
+            self.readPages[page] = view
+            if writable:
+                self.writePages[page] = view
+
+    def mapHandlers(self, first, last, read=None, write=None):
+        for page in range(first, last + 1):
+            handler = self.HandlerPage(page << 8, read, write)
+            if read is not None:
+                self.readPages[page] = handler
+            if write is not None:
+                self.writePages[page] = handler
+
+    def read(self, address):
+        return self.readPages[address >> 8][address & 0xFF]
+
+    def write(self, address, value):
+        self.writePages[address >> 8][address & 0xFF] = value
@@ -1,47 +1,42 @@
-import pygame
 import os
-import threading
+import sys
+import functools
 import multiprocessing
-import time
 from array import array
 import instructions
 import joypad
+import blockcache
+import jit
+from bus import MemoryBus
+from scheduler import Scheduler
+from pacing import FramePacer
+from ppu import LOG_WRITE, LOG_READ, LOG_DMA
 
+# CPU cycles per scanline
+SCANLINE_CYCLES = 113
 
-class CPU:
-    class VolatileMemory:  
-        def __init__(self, size):
-            self.ram = array('B', [0x00] * size)
-
-        def read(self, a=0x0):
-            return self.ram[a]
 
-        def write(self, a=0x0, v=0x0):
-            self.ram[a] = v
+class CPU:
+    __slots__ = ('console', 'scheduler',
+                 'PC', 'SP', 'A', 'X', 'Y', 'P',
+                 'instructions', 'opcodes', 'InterruptRequest', 'cart',
+                 'bus', 'RAM', 'PRG', 'prgWords', 'ioRegisters', 'readMemory', 'writeMemory',
+                 'blocks', 'scanline', 'count', 'z')
 
     def __init__(self, console=None):
         print("Initializing CPU...")
 
         self.console = console
-        self.clock = multiprocessing.Value("I", 0)
-
-        if not self.console.THREAD_MODE == "SINGLE":
-            self.end = threading.Event()
-
-        self.registers = {  'PC': 0,            #Program Counter
-                            'SP': 0xFF,         #Stack Pointer
-                            'A': 0,             #Accumulator
-                            'X': 0,             #Register X
-                            'Y': 0,             #Register Y
-                            'P': 0b00100000}    #Processor Status
-
-        self.statusFlags = {'c': 0,      #Carry Flag
-                            'z': 1,      #Zero Flag
-                            'i': 2,      #Interrupt Disable
-                            'd': 3,      #Decimal Mode
-                            'b': 4,      #Break Command
-                            'v': 6,      #Overflow Flag
-                            'n': 7 }     #Negative Flag
+        self.scheduler = Scheduler()
+        self.scheduler.schedule(SCANLINE_CYCLES, self.endScanline)
+
+
+        self.PC = 0                     #Program Counter
+        self.SP = 0xFF                  #Stack Pointer
+        self.A = 0                      #Accumulator
+        self.X = 0                      #Register X
+        self.Y = 0                      #Register Y
+        self.P = instructions.U_FLAG    #Processor Status
 
         self.instructions = {   0x00: instructions.BRK_Implied,
                                 0x01: instructions.ORA_Indirect_X,
@@ -279,11 +274,26 @@ class CPU:
                                 0xFF: instructions.ISB_Absolute_X
         }
 
-        self.RAM = self.VolatileMemory(0x10000)
+        # Dense dispatch table, one pre-bound handler per opcode. Unmapped
+        # opcodes land on the illegal opcode trap.
+        self.opcodes = [functools.partial(self.instructions.get(op, instructions.ILLEGAL_Opcode), self)
+                        for op in range(0x100)]
+
+        self.RAM = bytearray(0x800)
+        self.ioRegisters = bytearray([0xFF] * 0x20)
+        self.bus = MemoryBus()
+        self.readMemory = self.bus.read
+        self.writeMemory = self.bus.write
         self.InterruptRequest = multiprocessing.Value("c")
         self.InterruptRequest = 0x52  # R
         self.cart = self.console.cartridge
         self.load_ram_data()
+        if self.console.EXECUTION_MODE in ("BLOCKS", "JIT"):
+            self.blocks = blockcache.BlockCache(self)
+            if self.console.EXECUTION_MODE == "JIT":
+                self.blocks.compiler = jit.Compiler(self.blocks)
+        else:
+            self.blocks = None
         self.scanline = 0
         self.count = 0
         self.z = 0
@@ -295,164 +305,203 @@ class CPU:
             print("Mapper not available yet")
             exit(1)
 
-        i = 0
-        maxdata = self.cart.prgRomData.__len__()
-        while i < maxdata:
-            v = self.cart.prgRomData[i]
-            self.RAM.write(i + 0x8000, v)
-            if self.cart.prgRomCount == 1:
-                self.RAM.write(i + 0xC000, v)
-            i += 1
+        self.PRG = bytearray(self.cart.prgRomData)
         del self.cart.prgRomData
-        i = 0
-        while i < 0x20:
-            self.RAM.write(i + 0x4000, 0xFF)
-            i += 1
+
+        bus = self.bus
+        bus.mapMemory(0x00, 0x1F, self.RAM)
+        bus.mapHandlers(0x20, 0x3F, self.readPPURegister, self.writePPURegister)
+        bus.mapHandlers(0x40, 0x40, self.readIORegister, self.writeIORegister)
+        bus.mapHandlers(0x41, 0x5F, self.readUnmapped, self.writeUnmapped)
+        bus.mapHandlers(0x60, 0x7F, self.readSRAM, self.writeSRAM)
+        # A single 16KB bank is mirrored at 0xC000
+        bus.mapMemory(0x80, 0xFF, self.PRG, writable=False)
+        bus.mapHandlers(0x80, 0xFF, write=self.writeROM)
+
+        # Every little endian word in 0x8000 - 0xFFFE, indexed by address -
+        # 0x8000. PRG never changes, so operands can be decoded from here
+        # with a single index.
+        prg = bytes(self.readMemory(address) for address in range(0x8000, 0x10000))
+        self.prgWords = array('H', [prg[i] | (prg[i + 1] << 8) for i in range(0x7FFF)])
+
+    def fetchWord(self, address):
+        if 0x8000 <= address < 0xFFFF:
+            return self.prgWords[address - 0x8000]
+        return self.readMemory(address) | (self.readMemory(address + 1) << 8)
 
     def doInterruptRequest(self):
-        self.pushStack((self.registers['PC'] >> 8) & 0xFF)
-        self.pushStack(self.registers['PC'] & 0xFF)
-        self.pushStack(self.registers['P'])
+        self.pushStack((self.PC >> 8) & 0xFF)
+        self.pushStack(self.PC & 0xFF)
+        self.pushStack(self.P)
 
+        read = self.readMemory
         if self.InterruptRequest == 0x4E:  # N for NMI
-            self.registers['PC'] = self.RAM.read(0xFFFA) | (self.RAM.read(0xFFFB) << 8)
+            self.PC = read(0xFFFA) | (read(0xFFFB) << 8)
             self.z = 1
         elif self.InterruptRequest == 0x52:  # R for RESET
-            self.registers['PC'] = self.RAM.read(0xFFFC) | (self.RAM.read(0xFFFD) << 8)
-        elif self.InterruptRequest == 0x49 and not self.statusFlags['i']:  # I for INTERRUPT MASK
-            self.registers['PC'] = self.RAM.read(0xFFFE) | (self.RAM.read(0xFFFF) << 8)
+            self.PC = read(0xFFFC) | (read(0xFFFD) << 8)
+        elif self.InterruptRequest == 0x49 and not self.P & instructions.I_FLAG:  # I for INTERRUPT MASK
+            self.PC = read(0xFFFE) | (read(0xFFFF) << 8)
         self.InterruptRequest = 0x00
 
-    def writeMemory(self, address, value):
-        if address < 0x2000:
-            address &= 0x7FF
-            self.RAM.write(address, value)
-        elif 0x2000 <= address < 0x4000:
-            # PPU Registers
-            addrflag = (address-0x2000)&0xF
-            if addrflag == 0:
-                self.console.PPU.processControlReg1(value)
-            elif addrflag == 1:
-                self.console.PPU.processControlReg2(value)
-            elif addrflag == 3:
-                self.console.PPU.spriteRamAddr = value
-            elif addrflag == 4:
-                self.console.PPU.writeSprRam(value)
-            elif addrflag == 5:
-                self.console.PPU.processPPUSCROLL(value)
-            elif addrflag == 6:
-                self.console.PPU.processPPUADDR(value)
-            elif addrflag == 7:
-                self.console.PPU.writeVRAM(value)
-            self.RAM.write(address, value)
-        elif 0x4000 <= address < 0x4014 or address == 0x4015:
+    # 0x2000 - 0x3FFF
+    def readPPURegister(self, address):
+        ppu = self.console.PPU
+        ppu.sync()
+        addrflag = (address-0x2000) & 0xF
+        if ppu.log is not None:
+            ppu.log.append((self.scanline << 24) | ((LOG_READ | addrflag) << 16))
+        return ppu.readRegister(addrflag)
+
+    def writePPURegister(self, address, value):
+        ppu = self.console.PPU
+        ppu.sync()
+        addrflag = (address-0x2000) & 0xF
+        if ppu.log is not None:
+            ppu.log.append((self.scanline << 24) | ((LOG_WRITE | addrflag) << 16) | value)
+        ppu.writeRegister(addrflag, value)
+
+    # 0x4000 - 0x40FF
+    def readIORegister(self, address):
+        if address == 0x4016:
+            joypad.Strobe()
+            return joypad.KeysBuffer__
+        elif 0x4000 < address < 0x4020:
+            return self.ioRegisters[address - 0x4000]
+        raise Exception('Unhandled RAM read access')
+
+    def writeIORegister(self, address, value):
+        if 0x4000 <= address < 0x4014 or address == 0x4015:
             pass  # SPU not implemented yet
         elif address == 0x4014:
-            self.console.PPU.writeSprRamDMA(value)
-            self.RAM.write(address, value)
+            ppu = self.console.PPU
+            ppu.sync()
+            page = self.bus.readPages[value]
+            if ppu.log is not None:
+                entry = (self.scanline << 24) | (LOG_DMA << 16)
+                ppu.log.extend(entry | (i << 8) | page[i] for i in range(256))
+            ppu.writeSprRamDMA(page)
+            self.ioRegisters[address - 0x4000] = value
         elif address == 0x4016 or address == 0x4017:
             if joypad.LastWrote___ == 1 and value == 0:
                 joypad.ReadNumber__ = 0
             joypad.LastWrote___ = value
-            self.RAM.write(address, value)
-        elif 0x6000 <= address < 0x8000:
-            pass  # SRAM not implemented yet
-        elif 0x8000 <= address < 0x10000:
-            self.RAM.write(address, value)
+            self.ioRegisters[address - 0x4000] = value
         else:
             raise Exception('Unhandled RAM write access')
 
-    def readMemory(self, address):
-        value = 0x00
-        if address < 0x2000:
-            address &= 0x7FF
-            value = self.RAM.read(address)
-        elif 0x2000 <= address < 0x4000:
-            addrflag = (address-0x2000) & 0xF
-            if addrflag == 2:
-                value = self.console.PPU.readStatusFlag()
-            elif addrflag == 7:
-                value = self.console.PPU.readVRAM()
-            self.RAM.write(address, value)
-        elif address == 0x4016:
-            joypad.Strobe()
-            value = joypad.KeysBuffer__
-        elif 0x4000 < address < 0x4020:
-            value = self.RAM.read(address)
-        elif 0x6000 <= address < 0x8000:
-            pass  # SRAM not implemented yet
-        elif 0x8000 <= address < 0x10000:
-            value = self.RAM.read(address)
-        else:
-            raise Exception('Unhandled RAM read access')
+    # 0x4100 - 0x5FFF
+    def readUnmapped(self, address):
+        raise Exception('Unhandled RAM read access')
 
-        return value
+    def writeUnmapped(self, address, value):
+        raise Exception('Unhandled RAM write access')
 
-    def setStatus(self, flag, value):
-        if value:
-            self.registers['P'] |= 1 << flag
-        else:
-            self.registers['P'] &= ~(1 << flag)
+    # 0x6000 - 0x7FFF
+    def readSRAM(self, address):
+        return 0x00  # SRAM not implemented yet
 
-    def getStatus(self, flag):
-        if (self.registers['P'] & (1 << flag)) == 0:
-            return 0
-        else:
-            return 1
+    def writeSRAM(self, address, value):
+        pass  # SRAM not implemented yet
+
+    # 0x8000 - 0xFFFF
+    def writeROM(self, address, value):
+        pass  # PRG ROM is read-only under mapper 0
 
     def pushStack(self, value):
-        self.writeMemory(0x100 + self.registers['SP'], value)
-        self.registers['SP'] -= 1
+        self.writeMemory(0x100 + self.SP, value)
+        self.SP -= 1
 
     def pullStack(self):
-        self.registers['SP'] += 1
-        value = self.readMemory(0x100 + self.registers['SP'])
+        self.SP += 1
+        value = self.readMemory(0x100 + self.SP)
         return value
 
-    def run(self):
-        print("CPU OK")
-        a = 0
-        loopCounter = 0
-        fpsCounter = 0
-        cyclesCounter = 0
-        timer = time.perf_counter()
-        self.z = 0
-        while True:
-            
-            pygame.event.poll()
+    # Runs a single instruction, taking a pending interrupt first
+    def step(self):
+        if self.InterruptRequest != 0x00:
+            self.doInterruptRequest()
+
+        cycles = self.opcodes[self.readMemory(self.PC)]()
+        scheduler = self.scheduler
+        scheduler.now += cycles
+        if scheduler.now >= scheduler.deadline:
+            scheduler.runDue()
+        return cycles
 
+    # Runs until at least the given number of cycles have gone by, or until
+    # the scanline counter reaches scanline. Returns the cycles consumed.
+    def runFor(self, cycles, scanline=None):
+        opcodes = self.opcodes
+        readPages = self.bus.readPages
+        blocks = self.blocks
+        scheduler = self.scheduler
+        deadline = scheduler.deadline
+        start = now = scheduler.now
+        stop = start + cycles
+        while now < stop:
             # Interrupts
             if self.InterruptRequest != 0x00:
                 self.doInterruptRequest()
 
             # Executa a instrucao e armazena
-            instr = self.RAM.read(self.registers['PC'])
-            cycles = self.instructions[instr](self)
+            if blocks is None:
+                pc = self.PC
+                n = opcodes[readPages[pc >> 8][pc & 0xFF]]()
+            else:
+                n = blocks.execute(min(deadline, stop) - now)
+            now += n
 
-            self.clock.value += cycles
-            if (time.perf_counter() - timer) > 1:
-                fpsCounter = int(loopCounter/100)
-                timer = time.perf_counter()
-                loopCounter = 0
-            cyclesCounter = self.clock.value
+            if now >= deadline:
+                scheduler.now = now
+                scheduler.runDue()
+                deadline = scheduler.deadline
+                if self.scanline == scanline:
+                    break
+        scheduler.now = now
+        return now - start
 
-            if self.clock.value >= 113:
+    def runUntilScanline(self, scanline):
+        # The scanline counter goes from 0 to 254
+        if not 0 <= scanline <= 254:
+            raise Exception('No scanline {0}'.format(scanline))
+        return self.runFor(sys.maxsize, scanline)
+
+    # VBlank starts while scanline 240 ends, so this returns right after a
+    # frame has been presented
+    def runFrame(self):
+        return self.runUntilScanline(241)
+
+    # Scanline event. The next line is counted from when this one actually
+    # ended, cycles run past the deadline are not carried over.
+    def endScanline(self):
+        self.scheduler.schedule(SCANLINE_CYCLES, self.endScanline)
+        self.console.PPU.endScanline(self.scanline)
+        if self.scanline == 254:
+            self.scanline = -1
+        self.scanline += 1
+
+    def run(self):
+        print("CPU OK")
+        # pygame is only needed for the keyboard of its own window
+        try:
+            import pygame
+            joypad.usePygameKeys()
+        except ImportError:
+            pygame = None
+        pacer = FramePacer(self.console.SPEED)
+        self.z = 0
+        while True:
+            # Input is only sampled once per frame, and only with a window
+            if pygame is not None and pygame.display.get_init():
+                pygame.event.get()
                 joypad.keys = pygame.key.get_pressed()
                 if joypad.keys[pygame.K_ESCAPE] == 1:
                     exit()
-                self.clock.value = 0
-                if self.console.PPU.VBLANK.status:
-                    self.console.PPU.VBLANK.exit()
-                    if not self.console.THREAD_MODE == "SINGLE":
-                        self.end.set()
-                if 0 <= self.scanline < 240 and not self.console.PPU.VBLANK.status:
-                    self.console.PPU.doScanline()                
-                elif self.scanline == 240 and not self.console.PPU.VBLANK.status:
-                    #print("Cycles {0} | FPS: {1} | Scanline: {2}".format(cyclesCounter, fpsCounter, self.scanline))
-                    self.console.PPU.renderer.display.DEBUG_LAYER.text("Cycles {0} | FPS: {1}".format(cyclesCounter, fpsCounter))
-                    cyclesCounter = 0
-                    self.console.PPU.VBLANK.enter()
-                elif self.scanline == 254:
-                    self.scanline = -1
-                self.scanline += 1
-                loopCounter += 1
\ No newline at end of file
+                # Turbo runs uncapped while held
+                pacer.turbo = bool(joypad.keys[pygame.K_TAB])
+
+            # Stops right before VBlank, so the text goes out with this frame
+            self.runUntilScanline(240)
+            self.console.PPU.presenter.text(pacer.report())
+            pacer.endFrame()
@@ -1,5 +1,18 @@
 import addressingMode
 
+# Processor status flags
+C_FLAG = 0x01   # Carry Flag
+Z_FLAG = 0x02   # Zero Flag
+I_FLAG = 0x04   # Interrupt Disable
+D_FLAG = 0x08   # Decimal Mode
+B_FLAG = 0x10   # Break Command
+U_FLAG = 0x20   # Unused, always set
+V_FLAG = 0x40   # Overflow Flag
+N_FLAG = 0x80   # Negative Flag
+
+# N and Z flags for every byte value
+NZ_TABLE = bytes((v & N_FLAG) | (Z_FLAG if v == 0 else 0) for v in range(0x100))
+
 
 # TODO: Verificar se nao existem enderecamentos maiores que 1 byte
 def rel_addr(value):
@@ -11,43 +24,38 @@ def rel_addr(value):
 
 
 def advancePC(cpu, size):
-    cpu.registers['PC'] += size
+    cpu.PC += size
 
 
-def setN(cpu, value):
-    if value & (1 << 7) == 1 << 7:
-        cpu.setStatus(cpu.statusFlags['n'], 1)
-    else:
-        cpu.setStatus(cpu.statusFlags['n'], 0)
+def setNZ(cpu, value):
+    cpu.P = (cpu.P & 0x7D) | NZ_TABLE[value]
 
 
-def setZ(cpu, value):
-    if value == 0:
-        cpu.setStatus(cpu.statusFlags['z'], 1)
-    else:
-        cpu.setStatus(cpu.statusFlags['z'], 0)
+# value is a 9-bit result, bit 8 is the carry out
+def setNZC(cpu, value):
+    cpu.P = (cpu.P & 0x7C) | NZ_TABLE[value & 0xFF] | (value >> 8)
 
 
-def setO(cpu, value):
-    cpu.setStatus(cpu.statusFlags['v'], value)
+# Shared by ADC, SBC and the unofficial opcodes built on them
+def addWithCarry(cpu, value):
+    a = cpu.A
+    tmp = a + value + (cpu.P & C_FLAG)
+    overflow = (~(a ^ value) & (a ^ tmp) & 0x80) >> 1
+    cpu.P = (cpu.P & 0x3C) | NZ_TABLE[tmp & 0xFF] | overflow | (tmp >> 8)
+    cpu.A = tmp & 0xFF
 
 
-def setC(cpu, value):
-    cpu.setStatus(cpu.statusFlags['c'], value)
+def ILLEGAL_Opcode(cpu):
+    pc = cpu.PC
+    raise Exception('Illegal opcode 0x{0:02X} at 0x{1:04X}'.format(cpu.readMemory(pc), pc))
 
 
 def ADC_Immediate(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80)!=0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 0xFF)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    value = cpu.readMemory(cpu.PC+1)
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
     return nCycles
 
@@ -58,13 +66,7 @@ def ADC_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80) != 0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 0xFF)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
     return nCycles
 
@@ -75,13 +77,7 @@ def ADC_Zero_X(cpu):
 
     address = addressingMode.Zero_X(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80) != 0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 255)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
     return nCycles
 
@@ -92,13 +88,7 @@ def ADC_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80) != 0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 255)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
     return nCycles
 
@@ -109,13 +99,7 @@ def ADC_Absolute_X(cpu):
 
     address = addressingMode.Absolute_X(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80) != 0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 255)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
     return nCycles
 
@@ -126,13 +110,7 @@ def ADC_Absolute_Y(cpu):
 
     address = addressingMode.Absolute_Y(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80) != 0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 255)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
     return nCycles
 
@@ -144,13 +122,7 @@ def ADC_Indirect_X(cpu):
 
     address = addressingMode.Indirect_X(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80)!=0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 255)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
     return nCycles
 
@@ -161,13 +133,7 @@ def ADC_Indirect_Y(cpu):
 
     address = addressingMode.Indirect_Y(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80) != 0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 255)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
     return nCycles
 
@@ -176,11 +142,10 @@ def AND_Immediate(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.registers['A'] & cpu.readMemory(cpu.registers['PC']+1)
-    cpu.registers['A'] = value
+    value = cpu.A & cpu.readMemory(cpu.PC+1)
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -190,10 +155,9 @@ def AND_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] &= value
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZ(cpu, cpu.A)
     return nCycles
 
 
@@ -203,10 +167,9 @@ def AND_Zero_X(cpu):
 
     address = addressingMode.Zero_X(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] &= value
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZ(cpu, cpu.A)
     return nCycles
 
 
@@ -216,10 +179,9 @@ def AND_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] &= value
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZ(cpu, cpu.A)
     return nCycles
 
 
@@ -229,10 +191,9 @@ def AND_Absolute_X(cpu):
 
     address = addressingMode.Absolute_X(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] &= value
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZ(cpu, cpu.A)
     return nCycles
 
 
@@ -242,10 +203,9 @@ def AND_Absolute_Y(cpu):
 
     address = addressingMode.Absolute_Y(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] &= value
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZ(cpu, cpu.A)
     return nCycles
 
 
@@ -255,10 +215,9 @@ def AND_Indirect_X(cpu):
 
     address = addressingMode.Indirect_X(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] &= value
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZ(cpu, cpu.A)
     return nCycles
 
 
@@ -268,10 +227,9 @@ def AND_Indirect_Y(cpu):
 
     address = addressingMode.Indirect_Y(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] &= value
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZ(cpu, cpu.A)
     return nCycles
 
 
@@ -279,14 +237,10 @@ def ASL_Accumulator(cpu):
     size = 1
     nCycles = 2
 
-    value = cpu.registers['A']
-    setC(cpu, value & 0x80)
-    value <<= 1
-    value &= 0xFF
+    value = cpu.A << 1
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.registers['A'] = value
+    setNZC(cpu, value)
+    cpu.A = value & 0xFF
     return nCycles
 
 
@@ -295,14 +249,10 @@ def ASL_Zero(cpu):
     nCycles = 5
 
     address = addressingMode.Zero(cpu)
-    value = cpu.readMemory(address)
-    setC(cpu, value & 0x80)
-    value <<= 1
-    value &= 0xFF
+    value = cpu.readMemory(address) << 1
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.writeMemory(address, value)
+    setNZC(cpu, value)
+    cpu.writeMemory(address, value & 0xFF)
     return nCycles
 
 
@@ -311,14 +261,10 @@ def ASL_Zero_X(cpu):
     nCycles = 6
 
     address = addressingMode.Zero_X(cpu)
-    value = cpu.readMemory(address)
-    setC(cpu, value & 0x80)
-    value <<= 1
-    value &= 0xFF
+    value = cpu.readMemory(address) << 1
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.writeMemory(address, value)
+    setNZC(cpu, value)
+    cpu.writeMemory(address, value & 0xFF)
     return nCycles
 
 
@@ -327,14 +273,10 @@ def ASL_Absolute(cpu):
     nCycles = 6
 
     address = addressingMode.Absolute(cpu)
-    value = cpu.readMemory(address)
-    setC(cpu, value & 0x80)
-    value <<= 1
-    value &= 0xFF
+    value = cpu.readMemory(address) << 1
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.writeMemory(address, value)
+    setNZC(cpu, value)
+    cpu.writeMemory(address, value & 0xFF)
     return nCycles
 
 
@@ -343,14 +285,10 @@ def ASL_Absolute_X(cpu):
     nCycles = 7
 
     address = addressingMode.Absolute_X(cpu)
-    value = cpu.readMemory(address)
-    setC(cpu, value & 0x80)
-    value <<= 1
-    value &= 0xFF
+    value = cpu.readMemory(address) << 1
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.writeMemory(address, value)
+    setNZC(cpu, value)
+    cpu.writeMemory(address, value & 0xFF)
     return nCycles
 
 
@@ -358,10 +296,10 @@ def BCC_Relative(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
+    value = cpu.readMemory(cpu.PC+1)
     value = rel_addr(value)
-    if not cpu.getStatus(cpu.statusFlags['c']):
-        if (cpu.registers['PC'] & 0xFF00) != ((cpu.registers['PC'] + value) & 0xFF00):
+    if not cpu.P & C_FLAG:
+        if (cpu.PC & 0xFF00) != ((cpu.PC + value) & 0xFF00):
             nCycles += 2
         else:
             nCycles += 1
@@ -374,10 +312,10 @@ def BCS_Relative(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
+    value = cpu.readMemory(cpu.PC+1)
     value = rel_addr(value)
-    if cpu.getStatus(cpu.statusFlags['c']):
-        if (cpu.registers['PC'] & 0xFF00) != ((cpu.registers['PC'] + value) & 0xFF00):
+    if cpu.P & C_FLAG:
+        if (cpu.PC & 0xFF00) != ((cpu.PC + value) & 0xFF00):
             nCycles += 2
         else:
             nCycles += 1
@@ -390,10 +328,10 @@ def BEQ_Relative(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
+    value = cpu.readMemory(cpu.PC+1)
     value = rel_addr(value)
-    if cpu.getStatus(cpu.statusFlags['z']):
-        if (cpu.registers['PC'] & 0xFF00) != ((cpu.registers['PC'] + value) & 0xFF00):
+    if cpu.P & Z_FLAG:
+        if (cpu.PC & 0xFF00) != ((cpu.PC + value) & 0xFF00):
             nCycles += 2
         else:
             nCycles += 1
@@ -409,9 +347,8 @@ def BIT_Zero(cpu):
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value & cpu.registers['A'])
-    setO(cpu, (value >> 6) & 1)
+    # N and V are copied from bits 7 and 6 of the operand
+    cpu.P = (cpu.P & 0x3D) | (value & 0xC0) | NZ_TABLE[value & cpu.A] & Z_FLAG
     return nCycles
 
 
@@ -422,9 +359,8 @@ def BIT_Absolute(cpu):
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value & cpu.registers['A'])
-    setO(cpu, (value >> 6) & 1)
+    # N and V are copied from bits 7 and 6 of the operand
+    cpu.P = (cpu.P & 0x3D) | (value & 0xC0) | NZ_TABLE[value & cpu.A] & Z_FLAG
     return nCycles
 
 
@@ -432,10 +368,10 @@ def BMI_Relative(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
+    value = cpu.readMemory(cpu.PC+1)
     value = rel_addr(value)
-    if cpu.getStatus(cpu.statusFlags['n']):
-        if (cpu.registers['PC'] & 0xFF00) != ((cpu.registers['PC'] + value) & 0xFF00):
+    if cpu.P & N_FLAG:
+        if (cpu.PC & 0xFF00) != ((cpu.PC + value) & 0xFF00):
             nCycles += 2
         else:
             nCycles += 1
@@ -448,10 +384,10 @@ def BNE_Relative(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
+    value = cpu.readMemory(cpu.PC+1)
     value = rel_addr(value)
-    if not cpu.getStatus(cpu.statusFlags['z']):
-        if (cpu.registers['PC'] & 0xFF00) != ((cpu.registers['PC'] + value) & 0xFF00):
+    if not cpu.P & Z_FLAG:
+        if (cpu.PC & 0xFF00) != ((cpu.PC + value) & 0xFF00):
             nCycles += 2
         else:
             nCycles += 1
@@ -464,13 +400,13 @@ def BPL_Relative(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
+    value = cpu.readMemory(cpu.PC+1)
     value = rel_addr(value)
-    if not cpu.getStatus(cpu.statusFlags['n']):
+    if not cpu.P & N_FLAG:
         nCycles += 1
-        if (cpu.registers['PC'] & 0xFF00) != ((cpu.registers['PC'] + value) & 0xFF00):
+        if (cpu.PC & 0xFF00) != ((cpu.PC + value) & 0xFF00):
             nCycles += 1
-        #cpu.registers['PC'] += 1
+        #cpu.PC += 1
         advancePC(cpu, value)
     advancePC(cpu, size)
     return nCycles
@@ -480,12 +416,12 @@ def BRK_Implied(cpu):
     size = 1
     nCycles = 7
 
-    cpu.registers['PC'] += 2
-    cpu.pushStack((cpu.registers['PC'] >> 8) & 0xFF)
-    cpu.pushStack(cpu.registers['PC'] & 0xFF)
-    cpu.setStatus(cpu.statusFlags['b'], 1)
-    cpu.pushStack(cpu.registers['P'])
-    cpu.setStatus(cpu.statusFlags['i'], 1)
+    cpu.PC += 2
+    cpu.pushStack((cpu.PC >> 8) & 0xFF)
+    cpu.pushStack(cpu.PC & 0xFF)
+    cpu.P |= B_FLAG
+    cpu.pushStack(cpu.P)
+    cpu.P |= I_FLAG
     cpu.InterruptRequest = 0x49
     advancePC(cpu, size)
     return nCycles
@@ -495,10 +431,10 @@ def BVC_Relative(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
+    value = cpu.readMemory(cpu.PC+1)
     value = rel_addr(value)
-    if not cpu.getStatus(cpu.statusFlags['v']):
-        if (cpu.registers['PC'] & 0xFF00) != ((cpu.registers['PC'] + value) & 0xFF00):
+    if not cpu.P & V_FLAG:
+        if (cpu.PC & 0xFF00) != ((cpu.PC + value) & 0xFF00):
             nCycles += 2
         else:
             nCycles += 1
@@ -511,10 +447,10 @@ def BVS_Relative(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
+    value = cpu.readMemory(cpu.PC+1)
     value = rel_addr(value)
-    if cpu.getStatus(cpu.statusFlags['v']):
-        if (cpu.registers['PC'] & 0xFF00) != ((cpu.registers['PC'] + value) & 0xFF00):
+    if cpu.P & V_FLAG:
+        if (cpu.PC & 0xFF00) != ((cpu.PC + value) & 0xFF00):
             nCycles += 2
         else:
             nCycles += 1
@@ -527,7 +463,7 @@ def CLC_Implied(cpu):
     size = 1
     nCycles = 2
 
-    cpu.setStatus(cpu.statusFlags['c'], 0)
+    cpu.P &= ~C_FLAG
     advancePC(cpu, size)
     return nCycles
 
@@ -536,7 +472,7 @@ def CLD_Implied(cpu):
     size = 1
     nCycles = 2
 
-    cpu.setStatus(cpu.statusFlags['d'], 0)
+    cpu.P &= ~D_FLAG
     advancePC(cpu, size)
     return nCycles
 
@@ -545,7 +481,7 @@ def CLI_Implied(cpu):
     size = 1
     nCycles = 2
 
-    cpu.setStatus(cpu.statusFlags['i'], 0)
+    cpu.P &= ~I_FLAG
     advancePC(cpu, size)
     return nCycles
 
@@ -554,7 +490,7 @@ def CLV_Implied(cpu):
     size = 1
     nCycles = 2
 
-    cpu.setStatus(cpu.statusFlags['v'], 0)
+    cpu.P &= ~V_FLAG
     advancePC(cpu, size)
     return nCycles
 
@@ -563,12 +499,9 @@ def CMP_Immediate(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
-    value = cpu.registers['A'] - value
+    value = cpu.readMemory(cpu.PC+1)
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
     return nCycles
 
 
@@ -578,11 +511,8 @@ def CMP_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
     return nCycles
 
 
@@ -592,11 +522,8 @@ def CMP_Zero_X(cpu):
 
     address = addressingMode.Zero_X(cpu)
     value = cpu.readMemory(address)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
     return nCycles
 
 
@@ -606,11 +533,8 @@ def CMP_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
     return nCycles
 
 
@@ -620,11 +544,8 @@ def CMP_Absolute_X(cpu):
 
     address = addressingMode.Absolute_X(cpu)
     value = cpu.readMemory(address)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
     return nCycles
 
 
@@ -634,11 +555,8 @@ def CMP_Absolute_Y(cpu):
 
     address = addressingMode.Absolute_Y(cpu)
     value = cpu.readMemory(address)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
     return nCycles
 
 
@@ -648,11 +566,8 @@ def CMP_Indirect_X(cpu):
 
     address = addressingMode.Indirect_X(cpu)
     value = cpu.readMemory(address)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
     return nCycles
 
 
@@ -662,11 +577,8 @@ def CMP_Indirect_Y(cpu):
 
     address = addressingMode.Indirect_Y(cpu)
     value = cpu.readMemory(address)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
     return nCycles
 
 
@@ -674,12 +586,9 @@ def CPX_Immediate(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
-    value = cpu.registers['X'] - value
+    value = cpu.readMemory(cpu.PC+1)
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.X + 0x100 - value)
     return nCycles
 
 
@@ -689,11 +598,8 @@ def CPX_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    value = cpu.registers['X'] - value
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.X + 0x100 - value)
     return nCycles
 
 
@@ -703,11 +609,8 @@ def CPX_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    value = cpu.registers['X'] - value
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.X + 0x100 - value)
     return nCycles
 
 
@@ -715,12 +618,9 @@ def CPY_Immediate(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
-    value = cpu.registers['Y'] - value
+    value = cpu.readMemory(cpu.PC+1)
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.Y + 0x100 - value)
     return nCycles
 
 
@@ -730,11 +630,8 @@ def CPY_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    value = cpu.registers['Y'] - value
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.Y + 0x100 - value)
     return nCycles
 
 
@@ -744,11 +641,8 @@ def CPY_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    value = cpu.registers['Y'] - value
     advancePC(cpu, size)
-    setC(cpu, 1 if value >= 0 else 0)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.Y + 0x100 - value)
     return nCycles
 
 
@@ -761,8 +655,7 @@ def DEC_Zero(cpu):
     value = (value - 1) & 0xFF
     cpu.writeMemory(address, value)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -775,8 +668,7 @@ def DEC_Zero_X(cpu):
     value = (value - 1) & 0xFF
     cpu.writeMemory(address, value)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -789,8 +681,7 @@ def DEC_Absolute(cpu):
     value = (value - 1) & 0xFF
     cpu.writeMemory(address, value)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -803,8 +694,7 @@ def DEC_Absolute_X(cpu):
     value = (value - 1) & 0xFF
     cpu.writeMemory(address, value)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -812,12 +702,11 @@ def DEX_Implied(cpu):
     size = 1
     nCycles = 2
 
-    value = cpu.registers['X']
+    value = cpu.X
     value = (value - 1) & 0xFF
-    cpu.registers['X'] = value
+    cpu.X = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -825,12 +714,11 @@ def DEY_Implied(cpu):
     size = 1
     nCycles = 2
 
-    value = cpu.registers['Y']
+    value = cpu.Y
     value = (value - 1) & 0xFF
-    cpu.registers['Y'] = value
+    cpu.Y = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -838,12 +726,11 @@ def EOR_Immediate(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
-    value ^= cpu.registers['A']
-    cpu.registers['A'] = value
+    value = cpu.readMemory(cpu.PC+1)
+    value ^= cpu.A
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -853,11 +740,10 @@ def EOR_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    value ^= cpu.registers['A']
-    cpu.registers['A'] = value
+    value ^= cpu.A
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -867,11 +753,10 @@ def EOR_Zero_X(cpu):
 
     address = addressingMode.Zero_X(cpu)
     value = cpu.readMemory(address)
-    value ^= cpu.registers['A']
-    cpu.registers['A'] = value
+    value ^= cpu.A
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -881,11 +766,10 @@ def EOR_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    value ^= cpu.registers['A']
-    cpu.registers['A'] = value
+    value ^= cpu.A
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -895,11 +779,10 @@ def EOR_Absolute_X(cpu):
 
     address = addressingMode.Absolute_X(cpu)
     value = cpu.readMemory(address)
-    value ^= cpu.registers['A']
-    cpu.registers['A'] = value
+    value ^= cpu.A
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -909,11 +792,10 @@ def EOR_Absolute_Y(cpu):
 
     address = addressingMode.Absolute_Y(cpu)
     value = cpu.readMemory(address)
-    value ^= cpu.registers['A']
-    cpu.registers['A'] = value
+    value ^= cpu.A
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -923,11 +805,10 @@ def EOR_Indirect_X(cpu):
 
     address = addressingMode.Indirect_X(cpu)
     value = cpu.readMemory(address)
-    value ^= cpu.registers['A']
-    cpu.registers['A'] = value
+    value ^= cpu.A
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -937,11 +818,10 @@ def EOR_Indirect_Y(cpu):
 
     address = addressingMode.Indirect_Y(cpu)
     value = cpu.readMemory(address)
-    value ^= cpu.registers['A']
-    cpu.registers['A'] = value
+    value ^= cpu.A
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -954,8 +834,7 @@ def INC_Zero(cpu):
     value = (value + 1) & 0xFF
     cpu.writeMemory(address, value)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -968,8 +847,7 @@ def INC_Zero_X(cpu):
     value = (value + 1) & 0xFF
     cpu.writeMemory(address, value)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -982,8 +860,7 @@ def INC_Absolute(cpu):
     value = (value + 1) & 0xFF
     cpu.writeMemory(address, value)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -996,8 +873,7 @@ def INC_Absolute_X(cpu):
     value = (value + 1) & 0xFF
     cpu.writeMemory(address, value)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1005,12 +881,11 @@ def INX_Implied(cpu):
     size = 1
     nCycles = 2
 
-    value = cpu.registers['X']
+    value = cpu.X
     value = (value + 1) & 0xFF
-    cpu.registers['X'] = value
+    cpu.X = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1018,12 +893,11 @@ def INY_Implied(cpu):
     size = 1
     nCycles = 2
 
-    value = cpu.registers['Y']
+    value = cpu.Y
     value = (value + 1) & 0xFF
-    cpu.registers['Y'] = value
+    cpu.Y = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1033,7 +907,7 @@ def JMP_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     advancePC(cpu, size)
-    cpu.registers['PC'] = address
+    cpu.PC = address
     return nCycles
 
 
@@ -1043,7 +917,7 @@ def JMP_Indirect(cpu):
 
     address = addressingMode.Indirect(cpu)
     advancePC(cpu, size)
-    cpu.registers['PC'] = address
+    cpu.PC = address
     return nCycles
 
 
@@ -1053,9 +927,9 @@ def JSR_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     advancePC(cpu, 2)
-    cpu.pushStack((cpu.registers['PC'] >> 8) & 0xFF)
-    cpu.pushStack(cpu.registers['PC'] & 0xFF)
-    cpu.registers['PC'] = address
+    cpu.pushStack((cpu.PC >> 8) & 0xFF)
+    cpu.pushStack(cpu.PC & 0xFF)
+    cpu.PC = address
     return nCycles
 
 
@@ -1063,11 +937,10 @@ def LDA_Immediate(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
-    cpu.registers['A'] = value
+    value = cpu.readMemory(cpu.PC+1)
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1077,10 +950,9 @@ def LDA_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] = value
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1090,10 +962,9 @@ def LDA_Zero_X(cpu):
 
     address = addressingMode.Zero_X(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] = value
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1103,10 +974,9 @@ def LDA_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] = value
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1116,10 +986,9 @@ def LDA_Absolute_X(cpu):
 
     address = addressingMode.Absolute_X(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] = value
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1129,10 +998,9 @@ def LDA_Absolute_Y(cpu):
 
     address = addressingMode.Absolute_Y(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] = value
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1142,10 +1010,9 @@ def LDA_Indirect_X(cpu):
 
     address = addressingMode.Indirect_X(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] = value
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1155,10 +1022,9 @@ def LDA_Indirect_Y(cpu):
 
     address = addressingMode.Indirect_Y(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] = value
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1166,11 +1032,10 @@ def LDX_Immediate(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
-    cpu.registers['X'] = value
+    value = cpu.readMemory(cpu.PC+1)
+    cpu.X = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1180,10 +1045,9 @@ def LDX_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['X'] = value
+    cpu.X = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1193,10 +1057,9 @@ def LDX_Zero_Y(cpu):
 
     address = addressingMode.Zero_Y(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['X'] = value
+    cpu.X = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1206,10 +1069,9 @@ def LDX_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['X'] = value
+    cpu.X = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1219,10 +1081,9 @@ def LDX_Absolute_Y(cpu):
 
     address = addressingMode.Absolute_Y(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['X'] = value
+    cpu.X = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1230,11 +1091,10 @@ def LDY_Immediate(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
-    cpu.registers['Y'] = value
+    value = cpu.readMemory(cpu.PC+1)
+    cpu.Y = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1244,10 +1104,9 @@ def LDY_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['Y'] = value
+    cpu.Y = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1257,10 +1116,9 @@ def LDY_Zero_X(cpu):
 
     address = addressingMode.Zero_X(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['Y'] = value
+    cpu.Y = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1270,10 +1128,9 @@ def LDY_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['Y'] = value
+    cpu.Y = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1283,10 +1140,9 @@ def LDY_Absolute_X(cpu):
 
     address = addressingMode.Absolute_X(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['Y'] = value
+    cpu.Y = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1294,13 +1150,10 @@ def LSR_Accumulator(cpu):
     size = 1
     nCycles = 2
 
-    value = cpu.registers['A']
-    setC(cpu, value & 0x01)
-    value >>= 1
-    cpu.registers['A'] = value
+    value = cpu.A
+    cpu.A = value >> 1
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZC(cpu, ((value & 0x01) << 8) | cpu.A)
     return nCycles
 
 
@@ -1310,12 +1163,9 @@ def LSR_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    setC(cpu, value & 0x01)
-    value >>= 1
-    cpu.writeMemory(address, value)
+    cpu.writeMemory(address, value >> 1)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZC(cpu, ((value & 0x01) << 8) | (value >> 1))
     return nCycles
 
 
@@ -1325,12 +1175,9 @@ def LSR_Zero_X(cpu):
 
     address = addressingMode.Zero_X(cpu)
     value = cpu.readMemory(address)
-    setC(cpu, value & 0x01)
-    value >>= 1
-    cpu.writeMemory(address, value)
+    cpu.writeMemory(address, value >> 1)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZC(cpu, ((value & 0x01) << 8) | (value >> 1))
     return nCycles
 
 
@@ -1340,12 +1187,9 @@ def LSR_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    setC(cpu, value & 0x01)
-    value >>= 1
-    cpu.writeMemory(address, value)
+    cpu.writeMemory(address, value >> 1)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZC(cpu, ((value & 0x01) << 8) | (value >> 1))
     return nCycles
 
 
@@ -1355,12 +1199,9 @@ def LSR_Absolute_X(cpu):
 
     address = addressingMode.Absolute_X(cpu)
     value = cpu.readMemory(address)
-    setC(cpu, value & 0x01)
-    value >>= 1
-    cpu.writeMemory(address, value)
+    cpu.writeMemory(address, value >> 1)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZC(cpu, ((value & 0x01) << 8) | (value >> 1))
     return nCycles
 
 
@@ -1376,12 +1217,11 @@ def ORA_Immediate(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
-    value |= cpu.registers['A']
+    value = cpu.readMemory(cpu.PC+1)
+    value |= cpu.A
     advancePC(cpu, size)
-    cpu.registers['A'] = value
-    setN(cpu, value)
-    setZ(cpu, value)
+    cpu.A = value
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1391,11 +1231,10 @@ def ORA_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    value |= cpu.registers['A']
+    value |= cpu.A
     advancePC(cpu, size)
-    cpu.registers['A'] = value
-    setN(cpu, value)
-    setZ(cpu, value)
+    cpu.A = value
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1405,11 +1244,10 @@ def ORA_Zero_X(cpu):
 
     address = addressingMode.Zero_X(cpu)
     value = cpu.readMemory(address)
-    value |= cpu.registers['A']
+    value |= cpu.A
     advancePC(cpu, size)
-    cpu.registers['A'] = value
-    setN(cpu, value)
-    setZ(cpu, value)
+    cpu.A = value
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1419,11 +1257,10 @@ def ORA_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    value |= cpu.registers['A']
+    value |= cpu.A
     advancePC(cpu, size)
-    cpu.registers['A'] = value
-    setN(cpu, value)
-    setZ(cpu, value)
+    cpu.A = value
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1433,11 +1270,10 @@ def ORA_Absolute_X(cpu):
 
     address = addressingMode.Absolute_X(cpu)
     value = cpu.readMemory(address)
-    value |= cpu.registers['A']
+    value |= cpu.A
     advancePC(cpu, size)
-    cpu.registers['A'] = value
-    setN(cpu, value)
-    setZ(cpu, value)
+    cpu.A = value
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1447,11 +1283,10 @@ def ORA_Absolute_Y(cpu):
 
     address = addressingMode.Absolute_Y(cpu)
     value = cpu.readMemory(address)
-    value |= cpu.registers['A']
+    value |= cpu.A
     advancePC(cpu, size)
-    cpu.registers['A'] = value
-    setN(cpu, value)
-    setZ(cpu, value)
+    cpu.A = value
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1461,11 +1296,10 @@ def ORA_Indirect_X(cpu):
 
     address = addressingMode.Indirect_X(cpu)
     value = cpu.readMemory(address)
-    value |= cpu.registers['A']
+    value |= cpu.A
     advancePC(cpu, size)
-    cpu.registers['A'] = value
-    setN(cpu, value)
-    setZ(cpu, value)
+    cpu.A = value
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1475,11 +1309,10 @@ def ORA_Indirect_Y(cpu):
 
     address = addressingMode.Indirect_Y(cpu)
     value = cpu.readMemory(address)
-    value |= cpu.registers['A']
+    value |= cpu.A
     advancePC(cpu, size)
-    cpu.registers['A'] = value
-    setN(cpu, value)
-    setZ(cpu, value)
+    cpu.A = value
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1487,7 +1320,7 @@ def PHA_Implied(cpu):
     size = 1
     nCycles = 3
 
-    value = cpu.registers['A']
+    value = cpu.A
     cpu.pushStack(value)
     advancePC(cpu, size)
     return nCycles
@@ -1497,7 +1330,7 @@ def PHP_Implied(cpu):
     size = 1
     nCycles = 3
 
-    value = cpu.registers['P']
+    value = cpu.P
     cpu.pushStack(value)
     advancePC(cpu, size)
     return nCycles
@@ -1508,10 +1341,9 @@ def PLA_Implied(cpu):
     nCycles = 4
 
     value = cpu.pullStack()
-    cpu.registers['A'] = value
+    cpu.A = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
     return nCycles
 
 
@@ -1521,9 +1353,9 @@ def PLP_Implied(cpu):
 
     value = cpu.pullStack()
     # Don't set the break flag
-    cpu.registers['P'] = (value & 0xEF)
+    cpu.P = (value & 0xEF)
     # Always set the non used flag
-    cpu.registers['P'] |= (1 << 5)
+    cpu.P |= U_FLAG
     advancePC(cpu, size)
     return nCycles
 
@@ -1532,14 +1364,10 @@ def ROL_Accumulator(cpu):
     size = 1
     nCycles = 2
 
-    value = cpu.registers['A']
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    setC(cpu, (value >> 7) & 1)
-    value = ((value << 1) & 0xFF) + carry
+    value = (cpu.A << 1) | (cpu.P & C_FLAG)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.registers['A'] = value
+    setNZC(cpu, value)
+    cpu.A = value & 0xFF
     return nCycles
 
 
@@ -1548,14 +1376,10 @@ def ROL_Zero(cpu):
     nCycles = 5
 
     address = addressingMode.Zero(cpu)
-    value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    setC(cpu, (value >> 7) & 1)
-    value = ((value << 1) & 0xFF) + carry
+    value = (cpu.readMemory(address) << 1) | (cpu.P & C_FLAG)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.writeMemory(address, value)
+    setNZC(cpu, value)
+    cpu.writeMemory(address, value & 0xFF)
     return nCycles
 
 
@@ -1564,14 +1388,10 @@ def ROL_Zero_X(cpu):
     nCycles = 6
 
     address = addressingMode.Zero_X(cpu)
-    value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    setC(cpu, (value >> 7) & 1)
-    value = ((value << 1) & 0xFF) + carry
+    value = (cpu.readMemory(address) << 1) | (cpu.P & C_FLAG)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.writeMemory(address, value)
+    setNZC(cpu, value)
+    cpu.writeMemory(address, value & 0xFF)
     return nCycles
 
 
@@ -1580,14 +1400,10 @@ def ROL_Absolute(cpu):
     nCycles = 6
 
     address = addressingMode.Absolute(cpu)
-    value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    setC(cpu, (value >> 7) & 1)
-    value = ((value << 1) & 0xFF) + carry
+    value = (cpu.readMemory(address) << 1) | (cpu.P & C_FLAG)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.writeMemory(address, value)
+    setNZC(cpu, value)
+    cpu.writeMemory(address, value & 0xFF)
     return nCycles
 
 
@@ -1596,14 +1412,10 @@ def ROL_Absolute_X(cpu):
     nCycles = 7
 
     address = addressingMode.Absolute_X(cpu)
-    value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    setC(cpu, (value >> 7) & 1)
-    value = ((value << 1) & 0xFF) + carry
+    value = (cpu.readMemory(address) << 1) | (cpu.P & C_FLAG)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.writeMemory(address, value)
+    setNZC(cpu, value)
+    cpu.writeMemory(address, value & 0xFF)
     return nCycles
 
 
@@ -1611,15 +1423,10 @@ def ROR_Accumulator(cpu):
     size = 1
     nCycles = 2
 
-    value = cpu.registers['A']
-    if cpu.getStatus(cpu.statusFlags['c']):
-        value |= 0x100
-    setC(cpu, value & 0x01)
-    value >>= 1
+    value = cpu.A
+    cpu.A = (value >> 1) | ((cpu.P & C_FLAG) << 7)
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.registers['A'] = value
+    setNZC(cpu, ((value & 0x01) << 8) | cpu.A)
     return nCycles
 
 
@@ -1629,13 +1436,10 @@ def ROR_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    carry = (cpu.getStatus(cpu.statusFlags['c']) << 7)
-    setC(cpu, value & 0x01)
-    value = (value >> 1) + carry
+    result = (value >> 1) | ((cpu.P & C_FLAG) << 7)
     advancePC(cpu, size)
-    setN(cpu, (value >> 7) & 1)
-    setZ(cpu, value)
-    cpu.writeMemory(address, value)
+    setNZC(cpu, ((value & 0x01) << 8) | result)
+    cpu.writeMemory(address, result)
     return nCycles
 
 
@@ -1645,13 +1449,10 @@ def ROR_Zero_X(cpu):
 
     address = addressingMode.Zero_X(cpu)
     value = cpu.readMemory(address)
-    carry = (cpu.getStatus(cpu.statusFlags['c']) << 7)
-    setC(cpu, value & 0x01)
-    value = (value >> 1) + carry
+    result = (value >> 1) | ((cpu.P & C_FLAG) << 7)
     advancePC(cpu, size)
-    setN(cpu, (value >> 7) & 1)
-    setZ(cpu, value)
-    cpu.writeMemory(address, value)
+    setNZC(cpu, ((value & 0x01) << 8) | result)
+    cpu.writeMemory(address, result)
     return nCycles
 
 
@@ -1661,13 +1462,10 @@ def ROR_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    carry = (cpu.getStatus(cpu.statusFlags['c']) << 7)
-    setC(cpu, value & 0x01)
-    value = (value >> 1) + carry
+    result = (value >> 1) | ((cpu.P & C_FLAG) << 7)
     advancePC(cpu, size)
-    setN(cpu, (value >> 7) & 1)
-    setZ(cpu, value)
-    cpu.writeMemory(address, value)
+    setNZC(cpu, ((value & 0x01) << 8) | result)
+    cpu.writeMemory(address, result)
     return nCycles
 
 
@@ -1677,13 +1475,10 @@ def ROR_Absolute_X(cpu):
 
     address = addressingMode.Absolute_X(cpu)
     value = cpu.readMemory(address)
-    carry = (cpu.getStatus(cpu.statusFlags['c']) << 7)
-    setC(cpu, value & 0x01)
-    value = (value >> 1) + carry
+    result = (value >> 1) | ((cpu.P & C_FLAG) << 7)
     advancePC(cpu, size)
-    setN(cpu, (value >> 7) & 1)
-    setZ(cpu, value)
-    cpu.writeMemory(address, value)
+    setNZC(cpu, ((value & 0x01) << 8) | result)
+    cpu.writeMemory(address, result)
     return nCycles
 
 
@@ -1692,11 +1487,11 @@ def RTI_Implied(cpu):
     nCycles = 6
 
     value = cpu.pullStack()
-    cpu.registers['P'] = value
-    cpu.registers['P'] |= (1 << 5)
+    cpu.P = value
+    cpu.P |= U_FLAG
     value = cpu.pullStack()
     value |= (cpu.pullStack() << 8)
-    cpu.registers['PC'] = value
+    cpu.PC = value
     return nCycles
 
 
@@ -1706,7 +1501,7 @@ def RTS_Implied(cpu):
 
     value = cpu.pullStack()
     value += ((cpu.pullStack()) << 8)
-    cpu.registers['PC'] = value
+    cpu.PC = value
     advancePC(cpu, size)
     return nCycles
 
@@ -1715,15 +1510,9 @@ def SBC_Immediate(cpu):
     size = 2
     nCycles = 2
 
-    value = cpu.readMemory(cpu.registers['PC']+1)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    #Todo: Verificar o (1 - carry) depois
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    value = cpu.readMemory(cpu.PC+1)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
     return nCycles
 
@@ -1734,13 +1523,8 @@ def SBC_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
     return nCycles
 
@@ -1751,13 +1535,8 @@ def SBC_Zero_X(cpu):
 
     address = addressingMode.Zero_X(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
     return nCycles
 
@@ -1768,13 +1547,8 @@ def SBC_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
     return nCycles
 
@@ -1785,13 +1559,8 @@ def SBC_Absolute_X(cpu):
 
     address = addressingMode.Absolute_X(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
     return nCycles
 
@@ -1802,13 +1571,8 @@ def SBC_Absolute_Y(cpu):
 
     address = addressingMode.Absolute_Y(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
     return nCycles
 
@@ -1819,13 +1583,8 @@ def SBC_Indirect_X(cpu):
 
     address = addressingMode.Indirect_X(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
     return nCycles
 
@@ -1836,13 +1595,8 @@ def SBC_Indirect_Y(cpu):
 
     address = addressingMode.Indirect_Y(cpu)
     value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
     return nCycles
 
@@ -1851,7 +1605,7 @@ def SEC_Implied(cpu):
     size = 1
     nCycles = 2
 
-    cpu.setStatus(cpu.statusFlags['c'], 1)
+    cpu.P |= C_FLAG
     advancePC(cpu, size)
     return nCycles
 
@@ -1860,7 +1614,7 @@ def SED_Implied(cpu):
     size = 1
     nCycles = 2
 
-    cpu.setStatus(cpu.statusFlags['d'], 1)
+    cpu.P |= D_FLAG
     advancePC(cpu, size)
     return nCycles
 
@@ -1869,7 +1623,7 @@ def SEI_Implied(cpu):
     size = 1
     nCycles = 2
 
-    cpu.setStatus(cpu.statusFlags['i'], 1)
+    cpu.P |= I_FLAG
     advancePC(cpu, size)
     return nCycles
 
@@ -1879,7 +1633,7 @@ def STA_Zero(cpu):
     nCycles = 3
 
     address = addressingMode.Zero(cpu)
-    cpu.writeMemory(address, cpu.registers['A'])
+    cpu.writeMemory(address, cpu.A)
     advancePC(cpu, size)
     return nCycles
 
@@ -1889,7 +1643,7 @@ def STA_Zero_X(cpu):
     nCycles = 4
 
     address = addressingMode.Zero_X(cpu)
-    cpu.writeMemory(address, cpu.registers['A'])
+    cpu.writeMemory(address, cpu.A)
     advancePC(cpu, size)
     return nCycles
 
@@ -1899,7 +1653,7 @@ def STA_Absolute(cpu):
     nCycles = 4
 
     address = addressingMode.Absolute(cpu)
-    cpu.writeMemory(address, cpu.registers['A'])
+    cpu.writeMemory(address, cpu.A)
     advancePC(cpu, size)
     return nCycles
 
@@ -1909,7 +1663,7 @@ def STA_Absolute_X(cpu):
     nCycles = 5
 
     address = addressingMode.Absolute_X(cpu)
-    cpu.writeMemory(address, cpu.registers['A'])
+    cpu.writeMemory(address, cpu.A)
     advancePC(cpu, size)
     return nCycles
 
@@ -1919,7 +1673,7 @@ def STA_Absolute_Y(cpu):
     nCycles = 5
 
     address = addressingMode.Absolute_Y(cpu)
-    cpu.writeMemory(address, cpu.registers['A'])
+    cpu.writeMemory(address, cpu.A)
     advancePC(cpu, size)
     return nCycles
 
@@ -1929,7 +1683,7 @@ def STA_Indirect_X(cpu):
     nCycles = 6
 
     address = addressingMode.Indirect_X(cpu)
-    cpu.writeMemory(address, cpu.registers['A'])
+    cpu.writeMemory(address, cpu.A)
     advancePC(cpu, size)
     return nCycles
 
@@ -1939,7 +1693,7 @@ def STA_Indirect_Y(cpu):
     nCycles = 6
 
     address = addressingMode.Indirect_Y(cpu)
-    cpu.writeMemory(address, cpu.registers['A'])
+    cpu.writeMemory(address, cpu.A)
     advancePC(cpu, size)
     return nCycles
 
@@ -1949,7 +1703,7 @@ def STX_Zero(cpu):
     nCycles = 3
 
     address = addressingMode.Zero(cpu)
-    cpu.writeMemory(address, cpu.registers['X'])
+    cpu.writeMemory(address, cpu.X)
     advancePC(cpu, size)
     return nCycles
 
@@ -1959,7 +1713,7 @@ def STX_Zero_Y(cpu):
     nCycles = 4
 
     address = addressingMode.Zero_Y(cpu)
-    cpu.writeMemory(address, cpu.registers['X'])
+    cpu.writeMemory(address, cpu.X)
     advancePC(cpu, size)
     return nCycles
 
@@ -1969,7 +1723,7 @@ def STX_Absolute(cpu):
     nCycles = 4
 
     address = addressingMode.Absolute(cpu)
-    cpu.writeMemory(address, cpu.registers['X'])
+    cpu.writeMemory(address, cpu.X)
     advancePC(cpu, size)
     return nCycles
 
@@ -1979,7 +1733,7 @@ def STY_Zero(cpu):
     nCycles = 3
 
     address = addressingMode.Zero(cpu)
-    cpu.writeMemory(address, cpu.registers['Y'])
+    cpu.writeMemory(address, cpu.Y)
     advancePC(cpu, size)
     return nCycles
 
@@ -1989,7 +1743,7 @@ def STY_Zero_X(cpu):
     nCycles = 4
 
     address = addressingMode.Zero_X(cpu)
-    cpu.writeMemory(address, cpu.registers['Y'])
+    cpu.writeMemory(address, cpu.Y)
     advancePC(cpu, size)
     return nCycles
 
@@ -1999,7 +1753,7 @@ def STY_Absolute(cpu):
     nCycles = 4
 
     address = addressingMode.Absolute(cpu)
-    cpu.writeMemory(address, cpu.registers['Y'])
+    cpu.writeMemory(address, cpu.Y)
     advancePC(cpu, size)
     return nCycles
 
@@ -2008,10 +1762,9 @@ def TAX_Implied(cpu):
     size = 1
     nCycles = 2
 
-    value = cpu.registers['A']
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.registers['X'] = value
+    value = cpu.A
+    setNZ(cpu, value)
+    cpu.X = value
     advancePC(cpu, size)
     return nCycles
 
@@ -2020,10 +1773,9 @@ def TAY_Implied(cpu):
     size = 1
     nCycles = 2
 
-    value = cpu.registers['A']
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.registers['Y'] = value
+    value = cpu.A
+    setNZ(cpu, value)
+    cpu.Y = value
     advancePC(cpu, size)
     return nCycles
 
@@ -2032,10 +1784,9 @@ def TSX_Implied(cpu):
     size = 1
     nCycles = 2
 
-    value = cpu.registers['SP']
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.registers['X'] = value
+    value = cpu.SP
+    setNZ(cpu, value)
+    cpu.X = value
     advancePC(cpu, size)
     return nCycles
 
@@ -2044,10 +1795,9 @@ def TXA_Implied(cpu):
     size = 1
     nCycles = 2
 
-    value = cpu.registers['X']
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.registers['A'] = value
+    value = cpu.X
+    setNZ(cpu, value)
+    cpu.A = value
     advancePC(cpu, size)
     return nCycles
 
@@ -2056,7 +1806,7 @@ def TXS_Implied(cpu):
     size = 1
     nCycles = 2
 
-    cpu.registers['SP'] = cpu.registers['X']
+    cpu.SP = cpu.X
     advancePC(cpu, size)
     return nCycles
 
@@ -2065,10 +1815,9 @@ def TYA_Implied(cpu):
     size = 1
     nCycles = 2
 
-    value = cpu.registers['Y']
-    setN(cpu, value)
-    setZ(cpu, value)
-    cpu.registers['A'] = value
+    value = cpu.Y
+    setNZ(cpu, value)
+    cpu.A = value
     advancePC(cpu, size)
     return nCycles
 
@@ -2082,11 +1831,8 @@ def DCP_Zero(cpu):
     value = cpu.readMemory(address)
     value = (value - 1) & 0xFF
     cpu.writeMemory(address, value)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, ~value >> 8 & 0x1)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
 
     return nCycles
 
@@ -2098,11 +1844,8 @@ def DCP_Zero_X(cpu):
     value = cpu.readMemory(address)
     value = (value - 1) & 0xFF
     cpu.writeMemory(address, value)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, ~value >> 8 & 0x1)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
 
     return nCycles
 
@@ -2114,11 +1857,8 @@ def DCP_Absolute(cpu):
     value = cpu.readMemory(address)
     value = (value - 1) & 0xFF
     cpu.writeMemory(address, value)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, ~value >> 8 & 0x1)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
 
     return nCycles
 
@@ -2130,11 +1870,8 @@ def DCP_Absolute_X(cpu):
     value = cpu.readMemory(address)
     value = (value - 1) & 0xFF
     cpu.writeMemory(address, value)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, ~value >> 8 & 0x1)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
 
     return nCycles
 
@@ -2146,11 +1883,8 @@ def DCP_Absolute_Y(cpu):
     value = cpu.readMemory(address)
     value = (value - 1) & 0xFF
     cpu.writeMemory(address, value)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, ~value >> 8 & 0x1)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
 
     return nCycles
 
@@ -2162,11 +1896,8 @@ def DCP_Indirect_X(cpu):
     value = cpu.readMemory(address)
     value = (value - 1) & 0xFF
     cpu.writeMemory(address, value)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, ~value >> 8 & 0x1)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
 
     return nCycles
 
@@ -2178,11 +1909,8 @@ def DCP_Indirect_Y(cpu):
     value = cpu.readMemory(address)
     value = (value - 1) & 0xFF
     cpu.writeMemory(address, value)
-    value = cpu.registers['A'] - value
     advancePC(cpu, size)
-    setC(cpu, ~value >> 8 & 0x1)
-    setN(cpu, value)
-    setZ(cpu, value & 0xFF)
+    setNZC(cpu, cpu.A + 0x100 - value)
 
     return nCycles
 
@@ -2215,13 +1943,8 @@ def ISB_Zero(cpu):
     value = cpu.readMemory(address)
     value = (value + 1) & 0xFF
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
 
     return nCycles
@@ -2234,13 +1957,8 @@ def ISB_Zero_X(cpu):
     value = cpu.readMemory(address)
     value = (value + 1) & 0xFF
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
 
     return nCycles
@@ -2253,13 +1971,8 @@ def ISB_Absolute(cpu):
     value = cpu.readMemory(address)
     value = (value + 1) & 0xFF
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
 
     return nCycles
@@ -2272,13 +1985,8 @@ def ISB_Absolute_X(cpu):
     value = cpu.readMemory(address)
     value = (value + 1) & 0xFF
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
 
     return nCycles
@@ -2291,13 +1999,8 @@ def ISB_Absolute_Y(cpu):
     value = cpu.readMemory(address)
     value = (value + 1) & 0xFF
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
 
     return nCycles
@@ -2310,13 +2013,8 @@ def ISB_Indirect_X(cpu):
     value = cpu.readMemory(address)
     value = (value + 1) & 0xFF
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
 
     return nCycles
@@ -2329,13 +2027,8 @@ def ISB_Indirect_Y(cpu):
     value = cpu.readMemory(address)
     value = (value + 1) & 0xFF
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = cpu.registers['A'] - value - (1 - carry)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    setO(cpu, (((cpu.registers['A'] ^ tmp) & 0x80) != 0 and ((cpu.registers['A'] ^ value) & 0x80) != 0))
-    setC(cpu, 0 if tmp < 0 else 1)
-    cpu.registers['A'] = (tmp & 0xFF)
+    # A - M - (1 - C) is A + ~M + C
+    addWithCarry(cpu, value ^ 0xFF)
     advancePC(cpu, size)
 
     return nCycles
@@ -2346,11 +2039,10 @@ def LAX_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] = value
-    cpu.registers['X'] = value
+    cpu.A = value
+    cpu.X = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
 
     return nCycles
 
@@ -2360,11 +2052,10 @@ def LAX_Zero_Y(cpu):
 
     address = addressingMode.Zero_Y(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] = value
-    cpu.registers['X'] = value
+    cpu.A = value
+    cpu.X = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
 
     return nCycles
 
@@ -2374,11 +2065,10 @@ def LAX_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] = value
-    cpu.registers['X'] = value
+    cpu.A = value
+    cpu.X = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
 
     return nCycles
 
@@ -2388,11 +2078,10 @@ def LAX_Absolute_Y(cpu):
 
     address = addressingMode.Absolute_Y(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] = value
-    cpu.registers['X'] = value
+    cpu.A = value
+    cpu.X = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
 
     return nCycles
 
@@ -2402,11 +2091,10 @@ def LAX_Indirect_X(cpu):
 
     address = addressingMode.Indirect_X(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] = value
-    cpu.registers['X'] = value
+    cpu.A = value
+    cpu.X = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
 
     return nCycles
 
@@ -2416,11 +2104,10 @@ def LAX_Indirect_Y(cpu):
 
     address = addressingMode.Indirect_Y(cpu)
     value = cpu.readMemory(address)
-    cpu.registers['A'] = value
-    cpu.registers['X'] = value
+    cpu.A = value
+    cpu.X = value
     advancePC(cpu, size)
-    setN(cpu, value)
-    setZ(cpu, value)
+    setNZ(cpu, value)
 
     return nCycles
 
@@ -2429,15 +2116,11 @@ def RLA_Zero(cpu):
     nCycles = 5
 
     address = addressingMode.Zero(cpu)
-    value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    setC(cpu, (value >> 7) & 1)
-    value = ((value << 1) & 0xFF) + carry
-    cpu.registers['A'] &= value
+    value = (cpu.readMemory(address) << 1) | (cpu.P & C_FLAG)
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
-    cpu.writeMemory(address, value)
+    setNZC(cpu, (value & 0x100) | cpu.A)
+    cpu.writeMemory(address, value & 0xFF)
 
     return nCycles
 
@@ -2446,15 +2129,11 @@ def RLA_Zero_X(cpu):
     nCycles = 6
 
     address = addressingMode.Zero_X(cpu)
-    value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    setC(cpu, (value >> 7) & 1)
-    value = ((value << 1) & 0xFF) + carry
-    cpu.registers['A'] &= value
+    value = (cpu.readMemory(address) << 1) | (cpu.P & C_FLAG)
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
-    cpu.writeMemory(address, value)
+    setNZC(cpu, (value & 0x100) | cpu.A)
+    cpu.writeMemory(address, value & 0xFF)
 
     return nCycles
 
@@ -2463,15 +2142,11 @@ def RLA_Absolute(cpu):
     nCycles = 6
 
     address = addressingMode.Absolute(cpu)
-    value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    setC(cpu, (value >> 7) & 1)
-    value = ((value << 1) & 0xFF) + carry
-    cpu.registers['A'] &= value
+    value = (cpu.readMemory(address) << 1) | (cpu.P & C_FLAG)
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
-    cpu.writeMemory(address, value)
+    setNZC(cpu, (value & 0x100) | cpu.A)
+    cpu.writeMemory(address, value & 0xFF)
 
     return nCycles
 
@@ -2480,15 +2155,11 @@ def RLA_Absolute_X(cpu):
     nCycles = 7
 
     address = addressingMode.Absolute_X(cpu)
-    value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    setC(cpu, (value >> 7) & 1)
-    value = ((value << 1) & 0xFF) + carry
-    cpu.registers['A'] &= value
+    value = (cpu.readMemory(address) << 1) | (cpu.P & C_FLAG)
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
-    cpu.writeMemory(address, value)
+    setNZC(cpu, (value & 0x100) | cpu.A)
+    cpu.writeMemory(address, value & 0xFF)
 
     return nCycles
 
@@ -2497,15 +2168,11 @@ def RLA_Absolute_Y(cpu):
     nCycles = 7
 
     address = addressingMode.Absolute_Y(cpu)
-    value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    setC(cpu, (value >> 7) & 1)
-    value = ((value << 1) & 0xFF) + carry
-    cpu.registers['A'] &= value
+    value = (cpu.readMemory(address) << 1) | (cpu.P & C_FLAG)
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
-    cpu.writeMemory(address, value)
+    setNZC(cpu, (value & 0x100) | cpu.A)
+    cpu.writeMemory(address, value & 0xFF)
 
     return nCycles
 
@@ -2514,15 +2181,11 @@ def RLA_Indirect_X(cpu):
     nCycles = 8
 
     address = addressingMode.Indirect_X(cpu)
-    value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    setC(cpu, (value >> 7) & 1)
-    value = ((value << 1) & 0xFF) + carry
-    cpu.registers['A'] &= value
+    value = (cpu.readMemory(address) << 1) | (cpu.P & C_FLAG)
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
-    cpu.writeMemory(address, value)
+    setNZC(cpu, (value & 0x100) | cpu.A)
+    cpu.writeMemory(address, value & 0xFF)
 
     return nCycles
 
@@ -2531,15 +2194,11 @@ def RLA_Indirect_Y(cpu):
     nCycles = 8
 
     address = addressingMode.Indirect_Y(cpu)
-    value = cpu.readMemory(address)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    setC(cpu, (value >> 7) & 1)
-    value = ((value << 1) & 0xFF) + carry
-    cpu.registers['A'] &= value
+    value = (cpu.readMemory(address) << 1) | (cpu.P & C_FLAG)
+    cpu.A &= value
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
-    cpu.writeMemory(address, value)
+    setNZC(cpu, (value & 0x100) | cpu.A)
+    cpu.writeMemory(address, value & 0xFF)
 
     return nCycles
 
@@ -2549,17 +2208,11 @@ def RRA_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    carry = (cpu.getStatus(cpu.statusFlags['c']) << 7)
-    setC(cpu, value & 0x01)
-    value = (value >> 1) | carry
+    carry = value & 0x01
+    value = (value >> 1) | ((cpu.P & C_FLAG) << 7)
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80) != 0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 0xFF)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    cpu.P = (cpu.P & ~C_FLAG) | carry
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
 
     return nCycles
@@ -2570,17 +2223,11 @@ def RRA_Zero_X(cpu):
 
     address = addressingMode.Zero_X(cpu)
     value = cpu.readMemory(address)
-    carry = (cpu.getStatus(cpu.statusFlags['c']) << 7)
-    setC(cpu, value & 0x01)
-    value = (value >> 1) | carry
+    carry = value & 0x01
+    value = (value >> 1) | ((cpu.P & C_FLAG) << 7)
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80) != 0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 0xFF)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    cpu.P = (cpu.P & ~C_FLAG) | carry
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
 
     return nCycles
@@ -2591,17 +2238,11 @@ def RRA_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    carry = (cpu.getStatus(cpu.statusFlags['c']) << 7)
-    setC(cpu, value & 0x01)
-    value = (value >> 1) | carry
+    carry = value & 0x01
+    value = (value >> 1) | ((cpu.P & C_FLAG) << 7)
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80) != 0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 0xFF)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    cpu.P = (cpu.P & ~C_FLAG) | carry
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
 
     return nCycles
@@ -2612,17 +2253,11 @@ def RRA_Absolute_X(cpu):
 
     address = addressingMode.Absolute_X(cpu)
     value = cpu.readMemory(address)
-    carry = (cpu.getStatus(cpu.statusFlags['c']) << 7)
-    setC(cpu, value & 0x01)
-    value = (value >> 1) | carry
+    carry = value & 0x01
+    value = (value >> 1) | ((cpu.P & C_FLAG) << 7)
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80) != 0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 0xFF)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    cpu.P = (cpu.P & ~C_FLAG) | carry
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
 
     return nCycles
@@ -2633,17 +2268,11 @@ def RRA_Absolute_Y(cpu):
 
     address = addressingMode.Absolute_Y(cpu)
     value = cpu.readMemory(address)
-    carry = (cpu.getStatus(cpu.statusFlags['c']) << 7)
-    setC(cpu, value & 0x01)
-    value = (value >> 1) | carry
+    carry = value & 0x01
+    value = (value >> 1) | ((cpu.P & C_FLAG) << 7)
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80) != 0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 0xFF)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    cpu.P = (cpu.P & ~C_FLAG) | carry
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
 
     return nCycles
@@ -2654,17 +2283,11 @@ def RRA_Indirect_X(cpu):
 
     address = addressingMode.Indirect_X(cpu)
     value = cpu.readMemory(address)
-    carry = (cpu.getStatus(cpu.statusFlags['c']) << 7)
-    setC(cpu, value & 0x01)
-    value = (value >> 1) | carry
+    carry = value & 0x01
+    value = (value >> 1) | ((cpu.P & C_FLAG) << 7)
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80) != 0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 0xFF)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    cpu.P = (cpu.P & ~C_FLAG) | carry
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
 
     return nCycles
@@ -2675,17 +2298,11 @@ def RRA_Indirect_Y(cpu):
 
     address = addressingMode.Indirect_Y(cpu)
     value = cpu.readMemory(address)
-    carry = (cpu.getStatus(cpu.statusFlags['c']) << 7)
-    setC(cpu, value & 0x01)
-    value = (value >> 1) | carry
+    carry = value & 0x01
+    value = (value >> 1) | ((cpu.P & C_FLAG) << 7)
     cpu.writeMemory(address, value)
-    carry = cpu.getStatus(cpu.statusFlags['c'])
-    tmp = value + cpu.registers['A'] + carry
-    setO(cpu, not(((cpu.registers['A'] ^ value) & 0x80) != 0) and (((cpu.registers['A'] ^ tmp) & 0x80)))
-    setC(cpu, tmp > 0xFF)
-    setN(cpu, tmp)
-    setZ(cpu, tmp & 0xFF)
-    cpu.registers['A'] = (tmp & 0xFF)
+    cpu.P = (cpu.P & ~C_FLAG) | carry
+    addWithCarry(cpu, value)
     advancePC(cpu, size)
 
     return nCycles
@@ -2695,7 +2312,7 @@ def SAX_Zero(cpu):
     nCycles = 3
 
     address = addressingMode.Zero(cpu)
-    value = cpu.registers['X'] & cpu.registers['A']
+    value = cpu.X & cpu.A
     cpu.writeMemory(address, value)
     advancePC(cpu, size)
 
@@ -2706,7 +2323,7 @@ def SAX_Zero_Y(cpu):
     nCycles = 4
 
     address = addressingMode.Zero_Y(cpu)
-    value = cpu.registers['X'] & cpu.registers['A']
+    value = cpu.X & cpu.A
     cpu.writeMemory(address, value)
     advancePC(cpu, size)
 
@@ -2717,7 +2334,7 @@ def SAX_Absolute(cpu):
     nCycles = 4
 
     address = addressingMode.Absolute(cpu)
-    value = cpu.registers['X'] & cpu.registers['A']
+    value = cpu.X & cpu.A
     cpu.writeMemory(address, value)
     advancePC(cpu, size)
 
@@ -2728,7 +2345,7 @@ def SAX_Indirect_X(cpu):
     nCycles = 6
 
     address = addressingMode.Indirect_X(cpu)
-    value = cpu.registers['X'] & cpu.registers['A']
+    value = cpu.X & cpu.A
     cpu.writeMemory(address, value)
     advancePC(cpu, size)
 
@@ -2739,15 +2356,11 @@ def SLO_Zero(cpu):
     nCycles = 5
 
     address = addressingMode.Zero(cpu)
-    value = cpu.readMemory(address)
-    setC(cpu, value & 0x80)
-    value <<= 1
-    value &= 0xFF
-    cpu.writeMemory(address, value)
-    cpu.registers['A'] |= value
+    value = cpu.readMemory(address) << 1
+    cpu.writeMemory(address, value & 0xFF)
+    cpu.A |= value & 0xFF
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZC(cpu, (value & 0x100) | cpu.A)
 
     return nCycles
 
@@ -2756,15 +2369,11 @@ def SLO_Zero_X(cpu):
     nCycles = 6
 
     address = addressingMode.Zero_X(cpu)
-    value = cpu.readMemory(address)
-    setC(cpu, value & 0x80)
-    value <<= 1
-    value &= 0xFF
-    cpu.writeMemory(address, value)
-    cpu.registers['A'] |= value
+    value = cpu.readMemory(address) << 1
+    cpu.writeMemory(address, value & 0xFF)
+    cpu.A |= value & 0xFF
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZC(cpu, (value & 0x100) | cpu.A)
 
     return nCycles
 
@@ -2773,15 +2382,11 @@ def SLO_Absolute(cpu):
     nCycles = 6
 
     address = addressingMode.Absolute(cpu)
-    value = cpu.readMemory(address)
-    setC(cpu, value & 0x80)
-    value <<= 1
-    value &= 0xFF
-    cpu.writeMemory(address, value)
-    cpu.registers['A'] |= value
+    value = cpu.readMemory(address) << 1
+    cpu.writeMemory(address, value & 0xFF)
+    cpu.A |= value & 0xFF
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZC(cpu, (value & 0x100) | cpu.A)
 
     return nCycles
 
@@ -2790,15 +2395,11 @@ def SLO_Absolute_X(cpu):
     nCycles = 7
 
     address = addressingMode.Absolute_X(cpu)
-    value = cpu.readMemory(address)
-    setC(cpu, value & 0x80)
-    value <<= 1
-    value &= 0xFF
-    cpu.writeMemory(address, value)
-    cpu.registers['A'] |= value
+    value = cpu.readMemory(address) << 1
+    cpu.writeMemory(address, value & 0xFF)
+    cpu.A |= value & 0xFF
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZC(cpu, (value & 0x100) | cpu.A)
 
     return nCycles
 
@@ -2807,15 +2408,11 @@ def SLO_Absolute_Y(cpu):
     nCycles = 7
 
     address = addressingMode.Absolute_Y(cpu)
-    value = cpu.readMemory(address)
-    setC(cpu, value & 0x80)
-    value <<= 1
-    value &= 0xFF
-    cpu.writeMemory(address, value)
-    cpu.registers['A'] |= value
+    value = cpu.readMemory(address) << 1
+    cpu.writeMemory(address, value & 0xFF)
+    cpu.A |= value & 0xFF
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZC(cpu, (value & 0x100) | cpu.A)
 
     return nCycles
 
@@ -2824,15 +2421,11 @@ def SLO_Indirect_X(cpu):
     nCycles = 8
 
     address = addressingMode.Indirect_X(cpu)
-    value = cpu.readMemory(address)
-    setC(cpu, value & 0x80)
-    value <<= 1
-    value &= 0xFF
-    cpu.writeMemory(address, value)
-    cpu.registers['A'] |= value
+    value = cpu.readMemory(address) << 1
+    cpu.writeMemory(address, value & 0xFF)
+    cpu.A |= value & 0xFF
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZC(cpu, (value & 0x100) | cpu.A)
 
     return nCycles
 
@@ -2841,15 +2434,11 @@ def SLO_Indirect_Y(cpu):
     nCycles = 8
 
     address = addressingMode.Indirect_Y(cpu)
-    value = cpu.readMemory(address)
-    setC(cpu, value & 0x80)
-    value <<= 1
-    value &= 0xFF
-    cpu.writeMemory(address, value)
-    cpu.registers['A'] |= value
+    value = cpu.readMemory(address) << 1
+    cpu.writeMemory(address, value & 0xFF)
+    cpu.A |= value & 0xFF
     advancePC(cpu, size)
-    setN(cpu, cpu.registers['A'])
-    setZ(cpu, cpu.registers['A'])
+    setNZC(cpu, (value & 0x100) | cpu.A)
 
     return nCycles
 
@@ -2859,13 +2448,10 @@ def SRE_Zero(cpu):
 
     address = addressingMode.Zero(cpu)
     value = cpu.readMemory(address)
-    setC(cpu, value & 0x01)
-    value >>= 1
-    cpu.registers['A'] ^= value
-    cpu.writeMemory(address, value)
+    cpu.A ^= value >> 1
+    cpu.writeMemory(address, value >> 1)
     advancePC(cpu, size)
-    setZ(cpu, cpu.registers['A'])
-    setN(cpu, cpu.registers['A'])
+    setNZC(cpu, ((value & 0x01) << 8) | cpu.A)
 
     return nCycles
 
@@ -2875,13 +2461,10 @@ def SRE_Zero_X(cpu):
 
     address = addressingMode.Zero_X(cpu)
     value = cpu.readMemory(address)
-    setC(cpu, value & 0x01)
-    value >>= 1
-    cpu.registers['A'] ^= value
-    cpu.writeMemory(address, value)
+    cpu.A ^= value >> 1
+    cpu.writeMemory(address, value >> 1)
     advancePC(cpu, size)
-    setZ(cpu, cpu.registers['A'])
-    setN(cpu, cpu.registers['A'])
+    setNZC(cpu, ((value & 0x01) << 8) | cpu.A)
 
     return nCycles
 
@@ -2891,13 +2474,10 @@ def SRE_Absolute(cpu):
 
     address = addressingMode.Absolute(cpu)
     value = cpu.readMemory(address)
-    setC(cpu, value & 0x01)
-    value >>= 1
-    cpu.registers['A'] ^= value
-    cpu.writeMemory(address, value)
+    cpu.A ^= value >> 1
+    cpu.writeMemory(address, value >> 1)
     advancePC(cpu, size)
-    setZ(cpu, cpu.registers['A'])
-    setN(cpu, cpu.registers['A'])
+    setNZC(cpu, ((value & 0x01) << 8) | cpu.A)
 
     return nCycles
 
@@ -2907,13 +2487,10 @@ def SRE_Absolute_X(cpu):
 
     address = addressingMode.Absolute_X(cpu)
     value = cpu.readMemory(address)
-    setC(cpu, value & 0x01)
-    value >>= 1
-    cpu.registers['A'] ^= value
-    cpu.writeMemory(address, value)
+    cpu.A ^= value >> 1
+    cpu.writeMemory(address, value >> 1)
     advancePC(cpu, size)
-    setZ(cpu, cpu.registers['A'])
-    setN(cpu, cpu.registers['A'])
+    setNZC(cpu, ((value & 0x01) << 8) | cpu.A)
 
     return nCycles
 
@@ -2923,13 +2500,10 @@ def SRE_Absolute_Y(cpu):
 
     address = addressingMode.Absolute_Y(cpu)
     value = cpu.readMemory(address)
-    setC(cpu, value & 0x01)
-    value >>= 1
-    cpu.registers['A'] ^= value
-    cpu.writeMemory(address, value)
+    cpu.A ^= value >> 1
+    cpu.writeMemory(address, value >> 1)
     advancePC(cpu, size)
-    setZ(cpu, cpu.registers['A'])
-    setN(cpu, cpu.registers['A'])
+    setNZC(cpu, ((value & 0x01) << 8) | cpu.A)
 
     return nCycles
 
@@ -2939,13 +2513,10 @@ def SRE_Indirect_X(cpu):
 
     address = addressingMode.Indirect_X(cpu)
     value = cpu.readMemory(address)
-    setC(cpu, value & 0x01)
-    value >>= 1
-    cpu.registers['A'] ^= value
-    cpu.writeMemory(address, value)
+    cpu.A ^= value >> 1
+    cpu.writeMemory(address, value >> 1)
     advancePC(cpu, size)
-    setZ(cpu, cpu.registers['A'])
-    setN(cpu, cpu.registers['A'])
+    setNZC(cpu, ((value & 0x01) << 8) | cpu.A)
 
     return nCycles
 
@@ -2955,13 +2526,10 @@ def SRE_Indirect_Y(cpu):
 
     address = addressingMode.Indirect_Y(cpu)
     value = cpu.readMemory(address)
-    setC(cpu, value & 0x01)
-    value >>= 1
-    cpu.registers['A'] ^= value
-    cpu.writeMemory(address, value)
+    cpu.A ^= value >> 1
+    cpu.writeMemory(address, value >> 1)
     advancePC(cpu, size)
-    setZ(cpu, cpu.registers['A'])
-    setN(cpu, cpu.registers['A'])
+    setNZC(cpu, ((value & 0x01) << 8) | cpu.A)
 
     return nCycles
 
@@ -0,0 +1,347 @@
+import re
+from instructions import NZ_TABLE
+
+# Entries into a block before it gets compiled
+JIT_THRESHOLD = 16
+
+# Cycles returned by every handler, not counting the branch penalties
+CYCLES = (7, 6, 0, 8, 3, 3, 5, 5, 3, 2, 2, 0, 4, 4, 6, 6,
+          2, 5, 0, 8, 4, 4, 6, 6, 2, 4, 2, 7, 4, 4, 7, 7,
+          6, 6, 0, 8, 3, 3, 5, 5, 4, 2, 2, 0, 4, 4, 6, 6,
+          2, 5, 0, 8, 4, 4, 6, 6, 2, 4, 2, 7, 4, 4, 7, 7,
+          6, 6, 0, 8, 3, 3, 5, 5, 3, 2, 2, 0, 3, 4, 6, 6,
+          2, 5, 0, 8, 4, 4, 6, 6, 2, 4, 2, 7, 4, 4, 7, 7,
+          6, 6, 0, 8, 3, 3, 5, 5, 4, 2, 2, 0, 5, 4, 6, 6,
+          2, 5, 0, 8, 4, 4, 6, 6, 2, 4, 2, 7, 4, 4, 7, 7,
+          2, 6, 2, 6, 3, 3, 3, 3, 2, 2, 2, 0, 4, 4, 4, 4,
+          2, 6, 0, 0, 4, 4, 4, 4, 2, 5, 2, 0, 0, 5, 0, 0,
+          2, 6, 2, 6, 3, 3, 3, 3, 2, 2, 2, 0, 4, 4, 4, 4,
+          2, 5, 0, 6, 4, 4, 4, 4, 2, 4, 2, 0, 4, 4, 4, 4,
+          2, 6, 2, 8, 3, 3, 5, 5, 2, 2, 2, 0, 4, 4, 6, 6,
+          2, 5, 0, 8, 4, 4, 6, 6, 2, 4, 2, 7, 4, 4, 7, 7,
+          2, 6, 2, 8, 3, 3, 5, 5, 2, 2, 2, 2, 4, 4, 6, 6,
+          2, 5, 0, 8, 4, 4, 6, 6, 2, 4, 2, 7, 4, 4, 7, 7)
+
+REGISTERS = ('A', 'X', 'Y', 'P', 'SP')
+REGISTER_READ = re.compile(r'\b(A|X|Y|P|SP)\b')
+REGISTER_WRITE = re.compile(r'\b(A|X|Y|P|SP) [-+&|^]?= ')
+
+# Placeholder for reloading the locals after a handler ran, filled in once
+# the whole block is known. Writing them back goes before every cpu.PC store.
+SYNC_IN = '<sync in>'
+
+SET_NZ = 'P = (P & 0x7D) | NZ[{0}]'
+SET_NZC = 'P = (P & 0x7C) | NZ[{0} & 0xFF] | ({0} >> 8)'
+
+LOAD = {'LDA': 'A', 'LDX': 'X', 'LDY': 'Y'}
+STORE = {'STA': 'A', 'STX': 'X', 'STY': 'Y'}
+LOGIC = {'AND': '&', 'ORA': '|', 'EOR': '^'}
+COMPARE = {'CMP': 'A', 'CPX': 'X', 'CPY': 'Y'}
+SHIFT = ('ASL', 'LSR', 'ROL', 'ROR', 'INC', 'DEC')
+STEP = {'INX': ('X', '+'), 'INY': ('Y', '+'), 'DEX': ('X', '-'), 'DEY': ('Y', '-')}
+TRANSFER = {'TAX': ('X', 'A'), 'TAY': ('Y', 'A'), 'TXA': ('A', 'X'), 'TYA': ('A', 'Y'), 'TSX': ('X', 'SP')}
+FLAGS = {'CLC': 'P &= 0xFE', 'SEC': 'P |= 0x01',
+         'CLI': 'P &= 0xFB', 'SEI': 'P |= 0x04',
+         'CLD': 'P &= 0xF7', 'SED': 'P |= 0x08',
+         'CLV': 'P &= 0xBF'}
+BRANCH = {'BCC': 'not P & 0x01', 'BCS': 'P & 0x01',
+          'BNE': 'not P & 0x02', 'BEQ': 'P & 0x02',
+          'BPL': 'not P & 0x80', 'BMI': 'P & 0x80',
+          'BVC': 'not P & 0x40', 'BVS': 'P & 0x40'}
+
+
+# Turns hot blocks into Python functions. Registers live in locals for the
+# whole block and RAM/PRG accesses are indexed directly. Anything else (I/O
+# registers, SRAM, writes to pages holding code, unofficial opcodes) goes
+# back to the interpreter handler for that one instruction.
+class Compiler:
+    def __init__(self, cache):
+        self.cache = cache
+        self.cpu = cache.cpu
+        self.prgMask = len(self.cpu.PRG) - 1
+
+    def compile(self, block):
+        self.block = block
+        self.ram = block.start < 0x2000
+        self.lines = []
+        self.cycles = 0
+        # Whether any handler runs inside the block, and whether every path
+        # has already returned
+        self.slow = False
+        self.closed = False
+
+        last = len(block.code) - 1
+        for index, (pc, opcode, operand, size) in enumerate(block.code):
+            mnemonic, mode = self.cpu.instructions[opcode].__name__.split('_', 1)
+            self.lines.append('# {0:04X} {1}_{2}'.format(pc, mnemonic, mode))
+            self.emitInstruction(index, pc, opcode, operand, size, mnemonic, mode, index == last)
+        if not self.closed:
+            self.exit('0x{0:04X}'.format(block.end))
+
+        return self.build()
+
+    def build(self):
+        body = '\n'.join(line for line in self.lines if not line.startswith('#'))
+        if self.slow:
+            loaded = stored = REGISTERS
+        else:
+            names = set(REGISTER_READ.findall(body))
+            loaded = [r for r in REGISTERS if r in names]
+            names = set(REGISTER_WRITE.findall(body))
+            stored = [r for r in REGISTERS if r in names]
+
+        source = ['def run(cpu=cpu, RAM=RAM, PRG=PRG, NZ=NZ, codePages=codePages, handlers=handlers, block=block):']
+        source.extend('    {0} = cpu.{0}'.format(r) for r in loaded)
+        for line in self.lines:
+            indent = line[:len(line) - len(line.lstrip())]
+            text = line.strip()
+            if text == SYNC_IN:
+                source.extend('    {0}{1} = cpu.{1}'.format(indent, r) for r in loaded)
+            elif text.startswith('cpu.PC = '):
+                # Exits and handler calls need the registers the block changed
+                source.extend('    {0}cpu.{1} = {1}'.format(indent, r) for r in stored)
+                source.append('    ' + line)
+            else:
+                source.append('    ' + line)
+
+        namespace = {'cpu': self.cpu, 'RAM': self.cpu.RAM, 'PRG': self.cpu.PRG, 'NZ': NZ_TABLE,
+                     'codePages': self.cache.codePages, 'block': self.block,
+                     'handlers': [self.cpu.opcodes[code[1]] for code in self.block.code]}
+        exec(compile('\n'.join(source), '<block 0x{0:04X}>'.format(self.block.start), 'exec'), namespace)
+        return namespace['run']
+
+    def emit(self, lines, indent=''):
+        self.lines.extend(indent + line for line in lines)
+
+    def exit(self, pc, indent='', extra=0):
+        self.emit(['cpu.PC = ' + pc, 'return {0}'.format(self.cycles + extra)], indent)
+        if not indent:
+            self.closed = True
+
+    # Runs the handler on the CPU state; the last instruction of a block
+    # leaves the PC where the handler put it. Only the branches return a
+    # variable cycle count and those never get here.
+    def slowPath(self, index, pc, final, indent=''):
+        self.slow = True
+        self.emit(['cpu.PC = 0x{0:04X}'.format(pc), 'handlers[{0}]()'.format(index)], indent)
+        if final:
+            self.emit(['return {0}'.format(self.cycles)], indent)
+            if not indent:
+                self.closed = True
+        else:
+            self.emit([SYNC_IN], indent)
+            # A write may have rewritten this very block
+            if self.ram:
+                self.emit(['if not block.valid:', '    return {0}'.format(self.cycles)], indent)
+
+    # (setup, address) for the modes where the address is computed at run time
+    def dynamicAddress(self, mode, operand):
+        if mode == 'Absolute_X':
+            return [], '(0x{0:04X} + X) & 0xFFFF'.format(operand)
+        if mode == 'Absolute_Y':
+            return [], '(0x{0:04X} + Y) & 0xFFFF'.format(operand)
+        if mode == 'Indirect_X':
+            return ['t = (0x{0:02X} + X) & 0xFF'.format(operand)], 'RAM[t] | (RAM[(t + 1) & 0xFF] << 8)'
+        return [], '((RAM[0x{0:02X}] | (RAM[0x{1:02X}] << 8)) + Y) & 0xFFFF'.format(operand, (operand + 1) & 0xFF)
+
+    def emitRead(self, index, pc, mode, operand, final, body):
+        if mode == 'Immediate':
+            self.emit(body('0x{0:02X}'.format(operand)))
+        elif mode == 'Zero':
+            self.emit(['v = RAM[0x{0:02X}]'.format(operand)] + body('v'))
+        elif mode in ('Zero_X', 'Zero_Y'):
+            self.emit(['v = RAM[(0x{0:02X} + {1}) & 0xFF]'.format(operand, mode[-1])] + body('v'))
+        elif mode == 'Absolute':
+            if operand < 0x2000:
+                self.emit(['v = RAM[0x{0:03X}]'.format(operand & 0x7FF)] + body('v'))
+            elif operand >= 0x8000:
+                self.emit(['v = PRG[0x{0:04X}]'.format(operand & self.prgMask)] + body('v'))
+            else:
+                self.slowPath(index, pc, final)
+        else:
+            setup, address = self.dynamicAddress(mode, operand)
+            self.emit(setup + ['a = ' + address,
+                               'if a < 0x2000:',
+                               '    v = RAM[a & 0x7FF]'])
+            self.emit(body('v'), '    ')
+            self.emit(['elif a >= 0x8000:',
+                       '    v = PRG[a & 0x{0:04X}]'.format(self.prgMask)])
+            self.emit(body('v'), '    ')
+            self.emit(['else:'])
+            self.slowPath(index, pc, final, '    ')
+
+    # body gets the value read and a function building the store statement
+    def emitReadModifyWrite(self, index, pc, mode, operand, final, body):
+        if mode == 'Accumulator':
+            self.emit(body('A', lambda value: 'A = ' + value))
+            return
+
+        if mode == 'Zero':
+            address = '0x{0:02X}'.format(operand)
+            page = '0'
+        elif mode in ('Zero_X', 'Zero_Y'):
+            self.emit(['a = (0x{0:02X} + {1}) & 0xFF'.format(operand, mode[-1])])
+            address = 'a'
+            page = '0'
+        elif mode == 'Absolute':
+            if operand >= 0x2000:
+                self.slowPath(index, pc, final)
+                return
+            address = '0x{0:03X}'.format(operand & 0x7FF)
+            page = str((operand >> 8) & 0x7)
+        else:
+            setup, expression = self.dynamicAddress(mode, operand)
+            self.emit(setup + ['a = ' + expression])
+            address = 'a & 0x7FF'
+            page = '(a >> 8) & 0x7'
+            self.emit(['if a < 0x2000 and not codePages[{0}]:'.format(page),
+                       '    v = RAM[{0}]'.format(address)])
+            self.emit(body('v', lambda value: 'RAM[{0}] = {1}'.format(address, value)), '    ')
+            self.emit(['else:'])
+            self.slowPath(index, pc, final, '    ')
+            return
+
+        self.emit(['if not codePages[{0}]:'.format(page),
+                   '    v = RAM[{0}]'.format(address)])
+        self.emit(body('v', lambda value: 'RAM[{0}] = {1}'.format(address, value)), '    ')
+        self.emit(['else:'])
+        self.slowPath(index, pc, final, '    ')
+
+    def emitStore(self, index, pc, mode, operand, final, register):
+        self.emitReadModifyWrite(index, pc, mode, operand, final,
+                                 lambda value, store: [store(register)])
+
+    # Stack accesses stay on page 1 as long as SP is in range
+    def emitStack(self, index, pc, final, pushes, pulls, body):
+        if pushes:
+            guard = '{0} <= SP <= 0xFF and not codePages[1]'.format(pushes - 1)
+        else:
+            guard = '-1 <= SP <= 0x{0:02X}'.format(0xFF - pulls)
+        self.emit(['if ' + guard + ':'])
+        self.emit(body, '    ')
+        self.emit(['else:'])
+        self.slowPath(index, pc, final, '    ')
+
+    def emitInstruction(self, index, pc, opcode, operand, size, mnemonic, mode, final):
+        cycles = CYCLES[opcode]
+        following = pc + size
+
+        if mnemonic in BRANCH:
+            offset = operand - 0x100 if operand & 0x80 else operand
+            extra = 2 if (pc & 0xFF00) != ((pc + offset) & 0xFF00) else 1
+            self.cycles += cycles
+            self.emit(['if ' + BRANCH[mnemonic] + ':'])
+            # Left unmasked, like the handler does
+            self.exit('{0:#06x}'.format(pc + offset + size), '    ', extra)
+            self.exit('0x{0:04X}'.format(following))
+            return
+
+        if mnemonic in LOAD:
+            register = LOAD[mnemonic]
+            body = lambda v: ['{0} = {1}'.format(register, v), SET_NZ.format(register)]
+        elif mnemonic in LOGIC:
+            operator = LOGIC[mnemonic]
+            body = lambda v: ['A {0}= {1}'.format(operator, v), SET_NZ.format('A')]
+        elif mnemonic == 'ADC' or mnemonic == 'SBC':
+            invert = mnemonic == 'SBC'
+            def body(v):
+                lines = []
+                if v != 'v':
+                    lines.append('v = ' + v)
+                if invert:
+                    lines.append('v ^= 0xFF')
+                return lines + ['t = A + v + (P & 0x01)',
+                                'P = (P & 0x3C) | NZ[t & 0xFF] | ((~(A ^ v) & (A ^ t) & 0x80) >> 1) | (t >> 8)',
+                                'A = t & 0xFF']
+        elif mnemonic in COMPARE:
+            register = COMPARE[mnemonic]
+            body = lambda v: ['t = {0} + 0x100 - {1}'.format(register, v), SET_NZC.format('t')]
+        elif mnemonic == 'BIT':
+            body = lambda v: ['P = (P & 0x3D) | ({0} & 0xC0) | NZ[{0} & A] & 0x02'.format(v)]
+        else:
+            body = None
+
+        if body is not None and mode != 'Implied':
+            self.cycles += cycles
+            self.emitRead(index, pc, mode, operand, final, body)
+            return
+
+        if mnemonic in STORE and mode != 'Implied':
+            self.cycles += cycles
+            self.emitStore(index, pc, mode, operand, final, STORE[mnemonic])
+            return
+
+        if mnemonic in SHIFT and mode != 'Implied':
+            self.cycles += cycles
+            self.emitReadModifyWrite(index, pc, mode, operand, final, getattr(self, 'body' + mnemonic))
+            return
+
+        if mode == 'Implied':
+            lines = None
+            if mnemonic in STEP:
+                register, operator = STEP[mnemonic]
+                lines = ['{0} = ({0} {1} 1) & 0xFF'.format(register, operator), SET_NZ.format(register)]
+            elif mnemonic in TRANSFER:
+                target, source = TRANSFER[mnemonic]
+                lines = ['{0} = {1}'.format(target, source), SET_NZ.format(target)]
+            elif mnemonic == 'TXS':
+                lines = ['SP = X']
+            elif mnemonic in FLAGS:
+                lines = [FLAGS[mnemonic]]
+            elif mnemonic == 'NOP':
+                lines = []
+            if lines is not None:
+                self.cycles += cycles
+                self.emit(lines)
+                return
+
+            stack = {'PHA': (1, 0, ['RAM[0x100 + SP] = A', 'SP -= 1']),
+                     'PHP': (1, 0, ['RAM[0x100 + SP] = P', 'SP -= 1']),
+                     'PLA': (0, 1, ['SP += 1', 'A = RAM[0x100 + SP]', SET_NZ.format('A')]),
+                     'PLP': (0, 1, ['SP += 1', 'P = (RAM[0x100 + SP] & 0xEF) | 0x20']),
+                     'RTS': (0, 2, ['pc = (RAM[0x101 + SP] | (RAM[0x102 + SP] << 8)) + 1', 'SP += 2'])}
+            if mnemonic in stack:
+                pushes, pulls, lines = stack[mnemonic]
+                self.cycles += cycles
+                self.emitStack(index, pc, final, pushes, pulls, lines)
+                if mnemonic == 'RTS':
+                    self.exit('pc')
+                return
+
+        if mnemonic == 'JMP' and mode == 'Absolute':
+            self.cycles += cycles
+            self.exit('0x{0:04X}'.format(operand))
+            return
+
+        if mnemonic == 'JSR':
+            self.cycles += cycles
+            ret = pc + 2
+            self.emitStack(index, pc, final, 2, 0,
+                           ['RAM[0x100 + SP] = 0x{0:02X}'.format((ret >> 8) & 0xFF),
+                            'RAM[0xFF + SP] = 0x{0:02X}'.format(ret & 0xFF),
+                            'SP -= 2'])
+            self.exit('0x{0:04X}'.format(operand))
+            return
+
+        # Everything else runs through its handler
+        self.cycles += cycles
+        self.slowPath(index, pc, final)
+
+    def bodyASL(self, v, store):
+        return ['t = {0} << 1'.format(v), SET_NZC.format('t'), store('t & 0xFF')]
+
+    def bodyLSR(self, v, store):
+        return ['P = (P & 0x7C) | NZ[{0} >> 1] | ({0} & 0x01)'.format(v), store('{0} >> 1'.format(v))]
+
+    def bodyROL(self, v, store):
+        return ['t = ({0} << 1) | (P & 0x01)'.format(v), SET_NZC.format('t'), store('t & 0xFF')]
+
+    def bodyROR(self, v, store):
+        return ['t = ({0} >> 1) | ((P & 0x01) << 7)'.format(v),
+                'P = (P & 0x7C) | NZ[t] | ({0} & 0x01)'.format(v), store('t')]
+
+    def bodyINC(self, v, store):
+        return ['t = ({0} + 1) & 0xFF'.format(v), store('t'), SET_NZ.format('t')]
+
+    def bodyDEC(self, v, store):
+        return ['t = ({0} - 1) & 0xFF'.format(v), store('t'), SET_NZ.format('t')]
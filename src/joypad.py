@@ -1,37 +1,31 @@
-import pygame
+import collections
 
 KeysBuffer__=0
 ReadNumber__=0
 LastWrote___=0
 
-keys=[0]*255
+# Nothing pressed until the front end polls the keyboard. pygame 2 key
+# codes go past any small list, hence the default dict.
+keys=collections.defaultdict(int)
+
+# Key of each button in keys, in the order the game reads them: A, B,
+# Select, Start, Up, Down, Left, Right. None until the front end picks its
+# keyboard, so nothing reads as pressed.
+buttonKeys=(None,) * 8
+
+# The pygame keyboard, for a front end polling keys with pygame. pygame is
+# only loaded here, so runs without a window never need it.
+def usePygameKeys():
+	global buttonKeys
+	import pygame
+	buttonKeys=(pygame.K_a, pygame.K_s, pygame.K_SPACE, pygame.K_RETURN,
+	            pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT)
 
 def Strobe():
 	global KeysBuffer__, ReadNumber__, LastWrote___
 	KeysBuffer__=0
-	if ReadNumber__==0:
-		if keys[pygame.K_a]:
-			KeysBuffer__=1
-	elif ReadNumber__==1:
-		if keys[pygame.K_s]:
-			KeysBuffer__=1
-	elif ReadNumber__==2:
-		if keys[pygame.K_SPACE]:
-			KeysBuffer__=1
-	elif ReadNumber__==3:
-		if keys[pygame.K_RETURN]:
-			KeysBuffer__=1
-	elif ReadNumber__==4:
-		if keys[pygame.K_UP]:
-			KeysBuffer__=1
-	elif ReadNumber__==5:
-		if keys[pygame.K_DOWN]:
-			KeysBuffer__=1
-	elif ReadNumber__==6:
-		if keys[pygame.K_LEFT]:
-			KeysBuffer__=1
-	elif ReadNumber__==7:
-		if keys[pygame.K_RIGHT]:
+	if ReadNumber__<8:
+		if keys[buttonKeys[ReadNumber__]]:
 			KeysBuffer__=1
 	elif ReadNumber__==16:
 		KeysBuffer__=1
@@ -0,0 +1,171 @@
+import atexit
+import multiprocessing
+import queue
+from array import array
+from multiprocessing import shared_memory
+
+from ppu import PPU, LOG_READ, LOG_DMA
+
+
+# Layout of a frame slot in shared memory: the number of log entries, the
+# PPU access log of the frame, and the picture the worker drew from it
+LOG_CAPACITY = 0x10000
+COUNT_OFFSET = 0
+LOG_OFFSET = 4
+FRAME_OFFSET = LOG_OFFSET + LOG_CAPACITY * 4
+FRAME_SIZE = 256 * 240
+SLOT_SIZE = FRAME_OFFSET + FRAME_SIZE
+
+# The worker draws one frame while the CPU runs the next
+SLOTS = 2
+
+
+# Multi-core mode. The CPU process runs the CPU and the PPU registers but
+# draws nothing. Every PPU register access goes into the PPU log, and when
+# VBlank starts the log of the frame is handed to a worker process. The
+# worker replays it into a PPU of its own, scanline by scanline, so the
+# picture comes out as if it had been drawn in this process.
+class RenderPipeline:
+    def __init__(self, ppu):
+        self.ppu = ppu
+        ppu.log = array('I')
+        self.memory = shared_memory.SharedMemory(create=True, size=SLOT_SIZE * SLOTS)
+        self.frames = 0
+
+        # spawn keeps the worker clear of the window and audio state of
+        # this process
+        context = multiprocessing.get_context("spawn")
+        self.tasks = context.Queue()
+        self.done = context.Queue()
+        cartridge = ppu.console.cartridge
+        self.worker = context.Process(target=renderWorker,
+                                      args=(bytes(cartridge.chrRomData), cartridge.chrRomCount,
+                                            cartridge.mirror, self.memory.name, self.tasks, self.done),
+                                      daemon=True)
+        self.worker.start()
+        atexit.register(self.close)
+
+    # Hands the frame that just ended to the worker and copies the one before
+    # it into the frame buffer. Returns False while there is nothing to show.
+    def submit(self):
+        ppu = self.ppu
+        log = ppu.log
+        base = (self.frames % SLOTS) * SLOT_SIZE
+        buffer = self.memory.buf
+        count = len(log)
+        buffer[base + COUNT_OFFSET:base + LOG_OFFSET] = count.to_bytes(4, 'little')
+        # A log too long for the slot goes through the queue instead
+        if count <= LOG_CAPACITY:
+            buffer[base + LOG_OFFSET:base + LOG_OFFSET + count * 4] = memoryview(log).cast('B')
+            self.tasks.put((base, None))
+        else:
+            self.tasks.put((base, log.tobytes()))
+        ppu.log = array('I')
+        self.frames += 1
+
+        if self.frames < 2:
+            return False
+        while True:
+            try:
+                base = self.done.get(timeout=1)
+                break
+            except queue.Empty:
+                if not self.worker.is_alive():
+                    raise Exception('Render worker stopped')
+        ppu.frameBuffer[:] = buffer[base + FRAME_OFFSET:base + FRAME_OFFSET + FRAME_SIZE]
+        return True
+
+    # Safe to call more than once, it also runs at exit
+    def close(self):
+        atexit.unregister(self.close)
+        if self.worker.is_alive():
+            self.tasks.put(None)
+            self.worker.join(1)
+        self.memory.close()
+        self.memory.unlink()
+
+
+# What a PPU needs from the Console, for the copy the worker draws with
+class RenderConsole:
+    class Cartridge:
+        def __init__(self, chrRomData, chrRomCount, mirror):
+            self.chrRomData = chrRomData
+            self.chrRomCount = chrRomCount
+            self.mirror = mirror
+
+    # Only the scanline counter and the NMI line of the CPU
+    class CPU:
+        def __init__(self):
+            self.scanline = 0
+            self.InterruptRequest = 0x00
+
+    def __init__(self, chrRomData, chrRomCount, mirror):
+        self.RENDERER_TYPE = "null"
+        self.THREAD_MODE = "SINGLE"
+        self.PRESENT_POLICY = "inline"
+        # Frames are colour indices, the colours are picked on the other side
+        self.PALETTE = None
+        self.cartridge = RenderConsole.Cartridge(chrRomData, chrRomCount, mirror)
+        self.CPU = RenderConsole.CPU()
+        self.PPU = PPU(self)
+
+
+# Brings ppu from the end of the previous frame to the start of VBlank of
+# this one, replaying log. Also usable on its own to replay a recorded log.
+def replayFrame(ppu, log):
+    cpu = ppu.console.CPU
+    page = bytearray(256)
+    for entry in log:
+        scanline = entry >> 24
+        while cpu.scanline != scanline:
+            endScanline(ppu)
+
+        ppu.sync()
+        kind = (entry >> 16) & 0xFF
+        if kind == LOG_DMA:
+            index = (entry >> 8) & 0xFF
+            page[index] = entry & 0xFF
+            if index == 0xFF:
+                ppu.writeSprRamDMA(page)
+        elif kind & LOG_READ:
+            ppu.readRegister(kind & 0xF)
+        else:
+            ppu.writeRegister(kind, entry & 0xFF)
+
+    # Up to and including the end of line 240 of this frame
+    while True:
+        scanline = cpu.scanline
+        endScanline(ppu)
+        if scanline == 240:
+            break
+
+
+# The scanline counter part of CPU.endScanline
+def endScanline(ppu):
+    cpu = ppu.console.CPU
+    ppu.endScanline(cpu.scanline)
+    if cpu.scanline == 254:
+        cpu.scanline = -1
+    cpu.scanline += 1
+
+
+def renderWorker(chrRomData, chrRomCount, mirror, name, tasks, done):
+    memory = shared_memory.SharedMemory(name=name)
+    ppu = RenderConsole(chrRomData, chrRomCount, mirror).PPU
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        base, data = task
+        slot = memory.buf[base:base + SLOT_SIZE]
+        log = array('I')
+        if data is None:
+            count = int.from_bytes(slot[COUNT_OFFSET:LOG_OFFSET], 'little')
+            log.frombytes(slot[LOG_OFFSET:LOG_OFFSET + count * 4])
+        else:
+            log.frombytes(data)
+        replayFrame(ppu, log)
+        slot[FRAME_OFFSET:FRAME_OFFSET + FRAME_SIZE] = ppu.frameBuffer
+        slot.release()
+        done.put(base)
+    memory.close()
@@ -1,18 +1,42 @@
 from cartridge import romLoader
 from cpu import CPU
 from ppu import PPU
-import threading
-import pygame
+from palette import loadPalette, ntscPalette
+import argparse
 import sys
 
 
 class Console:
-    def __init__(self):
-        romPath = sys.argv[1]
+    def __init__(self, romPath=None, renderer="pygame", threadMode="SINGLE", presentPolicy=None,
+                 speed=None, palette=None, executionMode="INTERPRETER"):
+        if romPath is None:
+            romPath = sys.argv[1]
 
         self.cartridge = romLoader(romPath)
-        self.RENDERER_TYPE = "pygame"
-        self.THREAD_MODE = "SINGLE"
+        # pygame, pyglet, ncurse or null (no window, for batch runs)
+        self.RENDERER_TYPE = renderer
+        # SINGLE, or MULTI to draw the frames in a second process
+        self.THREAD_MODE = threadMode
+        # latest, strict or inline, see presenter.py. Batch runs show their
+        # frames in step by default. Windows that may only be drawn from the
+        # thread that made them (pyglet's GL context, pygame on macOS and
+        # Windows, where CPU.run pumps the events) are always shown inline.
+        threadBound = renderer == "pyglet" or (renderer == "pygame" and sys.platform in ("darwin", "win32"))
+        if presentPolicy is None:
+            presentPolicy = "inline" if threadBound or renderer in ("null", "headless") else "latest"
+        elif presentPolicy != "inline" and threadBound:
+            raise Exception('The ' + renderer + ' window can only be presented inline here')
+        self.PRESENT_POLICY = presentPolicy
+        # Multiple of the NTSC frame rate CPU.run keeps to, 0 for uncapped.
+        # Batch runs go uncapped by default.
+        if speed is None:
+            speed = 0 if renderer in ("null", "headless") else 1
+        self.SPEED = speed
+        # A palette.Palette, None for the built in colours
+        self.PALETTE = palette
+        # INTERPRETER, BLOCKS to run cached basic blocks, or JIT to also
+        # compile the hot ones
+        self.EXECUTION_MODE = executionMode
 
         try:
             self.cartridge.load()
@@ -29,14 +53,44 @@ class Console:
         #    raise Exception("Couldn't initialize PPU")      
 
     def powerOn(self):
-        if self.THREAD_MODE == "SINGLE":
-            self.PPU.run()
-            self.CPU.run()
-        else:
-            self.CPU.start()
-            self.PPU.start()
+        self.PPU.run()
+        self.CPU.run()
 
 
 if __name__ == '__main__':
-    console = Console()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('rom')
+    parser.add_argument('--renderer', default="pygame",
+                        choices=["pygame", "pyglet", "ncurse", "null", "headless"])
+    parser.add_argument('--multicore', action='store_true',
+                        help="draw the frames in a second process")
+    parser.add_argument('--present', choices=["latest", "strict", "inline"],
+                        help="drop frames the window cannot keep up with (latest), "
+                             "wait for every frame to be shown (strict) or show "
+                             "them from the emulation thread (inline)")
+    parser.add_argument('--speed', type=float,
+                        help="multiple of real time to run at, 0 for uncapped "
+                             "(hold Tab for turbo)")
+    parser.add_argument('--palette',
+                        help="a 192 or 1536 byte .pal file, or ntsc to generate "
+                             "one from the NTSC signal")
+    parser.add_argument('--hue', type=float, default=0.0,
+                        help="hue shift of the ntsc palette, in degrees")
+    parser.add_argument('--saturation', type=float, default=1.0,
+                        help="saturation of the ntsc palette")
+    parser.add_argument('--gamma', type=float, default=2.2,
+                        help="display gamma for the ntsc palette")
+    parser.add_argument('--execution', default="interpreter", choices=["interpreter", "blocks", "jit"],
+                        help="run instructions one at a time, from cached basic blocks, "
+                             "or also compile the hot blocks")
+    args = parser.parse_args()
+
+    palette = None
+    if args.palette == "ntsc":
+        palette = ntscPalette(args.hue, args.saturation, args.gamma)
+    elif args.palette is not None:
+        palette = loadPalette(args.palette)
+
+    console = Console(args.rom, args.renderer, "MULTI" if args.multicore else "SINGLE", args.present,
+                      args.speed, palette, args.execution.upper())
     console.powerOn()
\ No newline at end of file
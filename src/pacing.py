@@ -0,0 +1,83 @@
+import time
+
+
+# NTSC: 1789773 CPU cycles a second, 29780.5 of them a frame
+NTSC_FRAME_RATE = 60.0988
+
+# sleep() may wake late, so it only gets the wait up to this close to the
+# deadline and the rest is spun out
+SPIN_NS = 2000000
+
+# Once this many frames behind the pacing starts over from now, rather than
+# running flat out to catch up
+MAX_LAG = 4
+
+
+# Sleeps most of the way to deadline, in perf_counter_ns() time, and spins
+# the rest
+def waitUntil(deadline):
+    while True:
+        left = deadline - time.perf_counter_ns()
+        if left <= 0:
+            return
+        if left > SPIN_NS:
+            time.sleep((left - SPIN_NS) / 1e9)
+
+
+# Holds the emulation to a multiple of the NTSC frame rate. A speed of 0
+# means uncapped, as does turbo while it is on.
+class FramePacer:
+    def __init__(self, speed=1):
+        self.speed = speed
+        self.turbo = False
+        self.frameNs = 1e9 / NTSC_FRAME_RATE
+        self.deadline = None
+        # When the current frame started being emulated
+        self.started = time.perf_counter_ns()
+
+        # Averages over the last second, for report()
+        self.windowStart = self.started
+        self.frames = 0
+        self.busyNs = 0
+        self.fps = 0.0
+        self.frameTime = 0.0
+        self.busyTime = 0.0
+
+    # Time a frame should take right now, 0 when uncapped
+    def targetNs(self):
+        if self.turbo or not self.speed:
+            return 0
+        return self.frameNs / self.speed
+
+    # Called once per emulated frame. Waits until it is time for the next.
+    def endFrame(self):
+        now = time.perf_counter_ns()
+        self.busyNs += now - self.started
+        target = self.targetNs()
+        if target:
+            if self.deadline is None or now - self.deadline > MAX_LAG * target:
+                self.deadline = now
+            self.deadline += target
+            waitUntil(self.deadline)
+            now = time.perf_counter_ns()
+        else:
+            self.deadline = None
+        self.started = now
+
+        self.frames += 1
+        elapsed = now - self.windowStart
+        if elapsed >= 1e9:
+            self.fps = self.frames * 1e9 / elapsed
+            self.frameTime = elapsed / self.frames / 1e6
+            self.busyTime = self.busyNs / self.frames / 1e6
+            self.windowStart = now
+            self.frames = 0
+            self.busyNs = 0
+
+    # Achieved against target frame time, and how much of it the emulation
+    # itself took. The rest is headroom.
+    def report(self):
+        target = self.targetNs()
+        return "{0:.2f}/{1} ms | busy {2:.2f} ms | {3:.1f} fps".format(
+            self.frameTime, "{0:.2f}".format(target / 1e6) if target else "-",
+            self.busyTime, self.fps)
@@ -0,0 +1,256 @@
+# The colours the PPU can put out, and what its emphasis and greyscale bits
+# do to them. Frames hold colour indices (0-63); renderers turn them into RGB
+# with one of the tables here, swapped whenever those bits change, so the
+# bits cost nothing per pixel.
+
+import math
+import os
+
+# The 2C02 colours, as RGB
+NTSC_COLORS = ((0x75, 0x75, 0x75),
+               (0x27, 0x1B, 0x8F),
+               (0x00, 0x00, 0xAB),
+               (0x47, 0x00, 0x9F),
+               (0x8F, 0x00, 0x77),
+               (0xAB, 0x00, 0x13),
+               (0xA7, 0x00, 0x00),
+               (0x7F, 0x0B, 0x00),
+               (0x43, 0x2F, 0x00),
+               (0x00, 0x47, 0x00),
+               (0x00, 0x51, 0x00),
+               (0x00, 0x3F, 0x17),
+               (0x1B, 0x3F, 0x5F),
+               (0x00, 0x00, 0x00),
+               (0x00, 0x00, 0x00),
+               (0x00, 0x00, 0x00),
+               (0xBC, 0xBC, 0xBC),
+               (0x00, 0x73, 0xEF),
+               (0x23, 0x3B, 0xEF),
+               (0x83, 0x00, 0xF3),
+               (0xBF, 0x00, 0xBF),
+               (0xE7, 0x00, 0x5B),
+               (0xDB, 0x2B, 0x00),
+               (0xCB, 0x4F, 0x0F),
+               (0x8B, 0x73, 0x00),
+               (0x00, 0x97, 0x00),
+               (0x00, 0xAB, 0x00),
+               (0x00, 0x93, 0x3B),
+               (0x00, 0x83, 0x8B),
+               (0x00, 0x00, 0x00),
+               (0x00, 0x00, 0x00),
+               (0x00, 0x00, 0x00),
+               (0xFF, 0xFF, 0xFF),
+               (0x3F, 0xBF, 0xFF),
+               (0x5F, 0x97, 0xFF),
+               (0xA7, 0x8B, 0xFD),
+               (0xF7, 0x7B, 0xFF),
+               (0xFF, 0x77, 0xB7),
+               (0xFF, 0x77, 0x63),
+               (0xFF, 0x9B, 0x3B),
+               (0xF3, 0xBF, 0x3F),
+               (0x83, 0xD3, 0x13),
+               (0x4F, 0xDF, 0x4B),
+               (0x58, 0xF8, 0x98),
+               (0x00, 0xEB, 0xDB),
+               (0x00, 0x00, 0x00),
+               (0x00, 0x00, 0x00),
+               (0x00, 0x00, 0x00),
+               (0xFF, 0xFF, 0xFF),
+               (0xAB, 0xE7, 0xFF),
+               (0xC7, 0xD7, 0xFF),
+               (0xD7, 0xCB, 0xFF),
+               (0xFF, 0xC7, 0xFF),
+               (0xFF, 0xC7, 0xDB),
+               (0xFF, 0xBF, 0xB3),
+               (0xFF, 0xDB, 0xAB),
+               (0xFF, 0xE7, 0xA3),
+               (0xE3, 0xFF, 0xA3),
+               (0xAB, 0xF3, 0xBF),
+               (0xB3, 0xFF, 0xCF),
+               (0x9F, 0xFF, 0xF3),
+               (0x00, 0x00, 0x00),
+               (0x00, 0x00, 0x00),
+               (0x00, 0x00, 0x00))
+
+# How much each emphasis bit dims the two colour channels it does not
+# emphasize
+EMPHASIS_FACTOR = 0.816328
+
+
+# NES composite signal, in volts above sync: the low and high level of
+# the square wave for each luma level, black, white, and what emphasis
+# leaves of the signal
+SIGNAL_LEVELS = (0.350, 0.518, 0.962, 1.550, 1.094, 1.506, 1.962, 1.962)
+SIGNAL_BLACK = 0.518
+SIGNAL_WHITE = 1.962
+SIGNAL_ATTENUATION = 0.746
+
+# Phase the decoder takes colour 0 at, in twelfths of the colour carrier,
+# so that the default hue comes out close to NTSC_COLORS
+COLOR_PHASE = 4.0
+
+# Generated palettes are stored as .pal files in here. The version goes into
+# the file names, so a change to the generator leaves the old ones behind.
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'pynes')
+GENERATOR_VERSION = 1
+
+
+# Every colour under each of the 8 emphasis settings (PPUMASK bits 5-7, red,
+# green and blue), with and without greyscale (bit 0), worked out once.
+# Tables are indexed by emphasis << 1 | greyscale. The emphasized colours
+# come from emphasized, 8 tables of 64 colours, when given (a 1536 byte .pal
+# file has them), and are made up by dimming the channels otherwise.
+class Palette:
+    def __init__(self, colors=NTSC_COLORS, emphasized=None):
+        self.base = tuple(tuple(color) for color in colors)
+        if emphasized is None:
+            emphasized = [[emphasize(color, emphasis) for color in self.base] for emphasis in range(8)]
+        # Colours with the same RGB share a key, the first index with it
+        self.keys = bytes(self.base.index(color) for color in self.base)
+
+        self.tables = []
+        self.rgbTables = []
+        self.rgbaTables = []
+        self.channelTables = []
+        for variant in range(16):
+            emphasis = variant >> 1
+            table = []
+            for index in range(64):
+                if variant & 1:
+                    index &= 0x30
+                table.append(tuple(emphasized[emphasis][index]))
+            self.tables.append(table)
+            self.rgbTables.append(bytes(channel for color in table for channel in color))
+            self.rgbaTables.append(bytes(channel for color in table for channel in color + (0xFF,)))
+            self.channelTables.append(channelTables(table))
+
+    # The 64 colours as RGB tuples
+    def colors(self, emphasis=0, greyscale=False):
+        return self.tables[emphasis << 1 | bool(greyscale)]
+
+    # The 64 colours as packed RGB bytes, 3 per colour
+    def rgb(self, emphasis=0, greyscale=False):
+        return self.rgbTables[emphasis << 1 | bool(greyscale)]
+
+    # The 64 colours as packed RGBA bytes, 4 per colour, fully opaque
+    def rgba(self, emphasis=0, greyscale=False):
+        return self.rgbaTables[emphasis << 1 | bool(greyscale)]
+
+    # channelTables of the 64 colours, for packRGB
+    def channels(self, emphasis=0, greyscale=False):
+        return self.channelTables[emphasis << 1 | bool(greyscale)]
+
+
+def emphasize(color, emphasis):
+    color = list(color)
+    for channel in range(3):
+        if emphasis & (1 << channel):
+            for other in range(3):
+                if other != channel:
+                    color[other] *= EMPHASIS_FACTOR
+    return tuple(int(round(value)) for value in color)
+
+
+# bytes.translate tables that pick the red, green and blue of a colour index
+def channelTables(colors):
+    return tuple(bytes(color[channel] for color in colors) + bytes(256 - len(colors))
+                 for channel in range(3))
+
+
+# Packed RGB of a frame of colour indices, with channelTables of its colours.
+# Goes into rgb when given, a bytearray 3 times the size of frame.
+def packRGB(frame, channels, rgb=None):
+    if rgb is None:
+        rgb = bytearray(len(frame) * 3)
+    rgb[0::3] = frame.translate(channels[0])
+    rgb[1::3] = frame.translate(channels[1])
+    rgb[2::3] = frame.translate(channels[2])
+    return rgb
+
+
+# Palette of a .pal file: 64 colours (192 bytes), or 64 colours for each of
+# the 8 emphasis settings (1536 bytes)
+def loadPalette(path):
+    with open(path, 'rb') as palFile:
+        data = palFile.read()
+    if len(data) not in (192, 1536):
+        raise Exception('Not a palette file ' + path)
+    return paletteFromBytes(data)
+
+
+def paletteFromBytes(data):
+    tables = [[tuple(data[offset:offset + 3]) for offset in range(table, table + 192, 3)]
+              for table in range(0, len(data), 192)]
+    if len(tables) == 1:
+        return Palette(tables[0])
+    return Palette(tables[0], tables)
+
+
+# 1536 byte .pal data decoded from the NES composite signal, the way a TV
+# would: hue in degrees, saturation as a factor, and the gamma of the
+# display, 2.2 leaving the decoded levels as they are
+def generateNTSC(hue=0.0, saturation=1.0, gamma=2.2):
+    data = bytearray()
+    for emphasis in range(8):
+        for index in range(64):
+            color = index & 0x0F
+            level = (index >> 4) & 3
+            # Columns E and F are black, at level 1
+            if color > 13:
+                level = 1
+            low = SIGNAL_LEVELS[level]
+            high = SIGNAL_LEVELS[4 + level]
+            if color == 0:
+                low = high
+            if color > 12:
+                high = low
+
+            # One sample per twelfth of the colour carrier, decoded to YIQ
+            y = i = q = 0.0
+            for phase in range(12):
+                signal = high if (color + phase) % 12 < 6 else low
+                # Each emphasis bit dims the part of the wave in phase with
+                # colour 0, 4 or 8 (red, green, blue); E and F are left alone
+                if color < 14 and any(emphasis & (1 << bit) and (bit * 4 + phase) % 12 < 6
+                                      for bit in range(3)):
+                    signal *= SIGNAL_ATTENUATION
+                value = (signal - SIGNAL_BLACK) / (SIGNAL_WHITE - SIGNAL_BLACK)
+                angle = math.pi * (phase + COLOR_PHASE) / 6 + math.radians(hue)
+                y += value
+                i += value * math.cos(angle)
+                q += value * math.sin(angle)
+            y /= 12
+            i *= saturation / 6
+            q *= saturation / 6
+
+            for channel in (y + 0.946882 * i + 0.623557 * q,
+                            y - 0.274788 * i - 0.635691 * q,
+                            y - 1.108545 * i + 1.709007 * q):
+                channel = max(channel, 0.0) ** (2.2 / gamma)
+                data.append(min(255, int(round(channel * 255))))
+    return bytes(data)
+
+
+# Palette generated by generateNTSC. The table is kept in cacheDir, so
+# generating it again is only a file read. Failing to write the cache is not
+# an error, the palette is just generated again next time.
+def ntscPalette(hue=0.0, saturation=1.0, gamma=2.2, cacheDir=CACHE_DIR):
+    name = 'ntsc-v{0}-h{1!r}-s{2!r}-g{3!r}.pal'.format(GENERATOR_VERSION, float(hue),
+                                                       float(saturation), float(gamma))
+    path = os.path.join(cacheDir, name)
+    try:
+        return loadPalette(path)
+    except Exception:
+        pass
+
+    data = generateNTSC(hue, saturation, gamma)
+    try:
+        os.makedirs(cacheDir, exist_ok=True)
+        # Written aside and renamed, for workers starting at the same time
+        temporary = '{0}.{1}'.format(path, os.getpid())
+        with open(temporary, 'wb') as palFile:
+            palFile.write(data)
+        os.replace(temporary, path)
+    except OSError:
+        pass
+    return paletteFromBytes(data)
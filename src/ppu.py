@@ -4,6 +4,32 @@ import time
 from array import array
 
 from renderer import RendererManager
+from presenter import FramePresenter
+from palette import Palette, packRGB
+
+# NumPy is optional, it only speeds up the background
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    TILE_PIXELS = numpy.arange(8)
+
+# A cleared frame, every pixel on colour 0x0F (black)
+BLANK_FRAME = bytes([0x0F]) * (256 * 240)
+
+# Kinds of entry in the PPU access log. Each access is one word of an
+# array('I'): scanline << 24 | kind << 16 | index << 8 | value. Writes and
+# reads carry the register number (address & 0xF) in the low bits of the
+# kind, OAM DMA logs its 256 bytes with their index.
+LOG_WRITE = 0x00
+LOG_READ = 0x10
+LOG_DMA = 0x20
+
+# Palette RAM entries a write to $3F00 or $3F10 lands on, the backdrop
+# colour being shared by all eight palettes
+BACKDROP_ENTRIES = (0x3F00, 0x3F04, 0x3F08, 0x3F0C, 0x3F10, 0x3F14, 0x3F18, 0x3F1C)
 
 class PPU:
 
@@ -26,16 +52,37 @@ class PPU:
             if self._console.PPU.NMI:
                 self._console.CPU.InterruptRequest = 0x4E # N
             self.status = True
-            while True:
-                try:
-                    self._console.PPU.renderer.display.blit()
-                    break
-                except:
-                    pass
+            ppu = self._console.PPU
+            ppu.sync()
+            ppu.nextLine = 0
+            # Emphasis and greyscale only pick the colours the frame is
+            # shown with
+            colors = ppu.palette.colors(ppu.colorIntensity, ppu.colorMode)
+            if ppu.pipeline is not None:
+                # Shows the frame before this one, which the worker drew
+                # while this one ran
+                ppu.inFrame = False
+                if not ppu.pipeline.submit():
+                    return
+                ppu.finishFrame()
+            else:
+                ppu.endFrame()
+                ppu.finishFrame()
+                # An unchanged frame is already on screen, in these colours
+                # and under this status line
+                if (not ppu.frameChanged and colors is ppu.presenter.colors
+                        and not ppu.presenter.textChanged()):
+                    return
+            ppu.presenter.present(colors)
 
         def exit(self):
             self.status = False
-            self._console.PPU.renderer.display.clear()
+            ppu = self._console.PPU
+            # Frames that get drawn start blank anyway, so only a clear
+            # between the first scanline and the blit shows up
+            if ppu.inFrame:
+                ppu.clearFrame()
+            ppu.presenter.clear()
 
     def __init__(self, console=None):
         print("Initializing PPU...")
@@ -47,7 +94,7 @@ class PPU:
         self.backgroundPatternTable = 0
         self.spriteSize = 8
         self.NMI = False
-        self.colorMode = True
+        self.colorMode = False
         self.clippingBackground = False
         self.clippingSprites = False
         self.showBackground = False
@@ -56,7 +103,7 @@ class PPU:
 
         self.spriteRamAddr = 0
         self.vRamWrites = 0
-        self.scanlineSpriteCount = 0
+        self.spriteOverflow = False
         self.sprite0Hit = 0
         self.spriteHitOccured = False
         self.VRAMAddress = 0
@@ -69,83 +116,108 @@ class PPU:
         self.ppuMirroring = 0
         self.addressMirroring = 0
 
-        self.colorPallete = [(0x75, 0x75, 0x75),
-                             (0x27, 0x1B, 0x8F),
-                             (0x00, 0x00, 0xAB),
-                             (0x47, 0x00, 0x9F),
-                             (0x8F, 0x00, 0x77),
-                             (0xAB, 0x00, 0x13),
-                             (0xA7, 0x00, 0x00),
-                             (0x7F, 0x0B, 0x00),
-                             (0x43, 0x2F, 0x00),
-                             (0x00, 0x47, 0x00),
-                             (0x00, 0x51, 0x00),
-                             (0x00, 0x3F, 0x17),
-                             (0x1B, 0x3F, 0x5F),
-                             (0x00, 0x00, 0x00),
-                             (0x00, 0x00, 0x00),
-                             (0x00, 0x00, 0x00),
-                             (0xBC, 0xBC, 0xBC),
-                             (0x00, 0x73, 0xEF),
-                             (0x23, 0x3B, 0xEF),
-                             (0x83, 0x00, 0xF3),
-                             (0xBF, 0x00, 0xBF),
-                             (0xE7, 0x00, 0x5B),
-                             (0xDB, 0x2B, 0x00),
-                             (0xCB, 0x4F, 0x0F),
-                             (0x8B, 0x73, 0x00),
-                             (0x00, 0x97, 0x00),
-                             (0x00, 0xAB, 0x00),
-                             (0x00, 0x93, 0x3B),
-                             (0x00, 0x83, 0x8B),
-                             (0x00, 0x00, 0x00),
-                             (0x00, 0x00, 0x00),
-                             (0x00, 0x00, 0x00),
-                             (0xFF, 0xFF, 0xFF),
-                             (0x3F, 0xBF, 0xFF),
-                             (0x5F, 0x97, 0xFF),
-                             (0xA7, 0x8B, 0xFD),
-                             (0xF7, 0x7B, 0xFF),
-                             (0xFF, 0x77, 0xB7),
-                             (0xFF, 0x77, 0x63),
-                             (0xFF, 0x9B, 0x3B),
-                             (0xF3, 0xBF, 0x3F),
-                             (0x83, 0xD3, 0x13),
-                             (0x4F, 0xDF, 0x4B),
-                             (0x58, 0xF8, 0x98),
-                             (0x00, 0xEB, 0xDB),
-                             (0x00, 0x00, 0x00),
-                             (0x00, 0x00, 0x00),
-                             (0x00, 0x00, 0x00),
-                             (0xFF, 0xFF, 0xFF),
-                             (0xAB, 0xE7, 0xFF),
-                             (0xC7, 0xD7, 0xFF),
-                             (0xD7, 0xCB, 0xFF),
-                             (0xFF, 0xC7, 0xFF),
-                             (0xFF, 0xC7, 0xDB),
-                             (0xFF, 0xBF, 0xB3),
-                             (0xFF, 0xDB, 0xAB),
-                             (0xFF, 0xE7, 0xA3),
-                             (0xE3, 0xFF, 0xA3),
-                             (0xAB, 0xF3, 0xBF),
-                             (0xB3, 0xFF, 0xCF),
-                             (0x9F, 0xFF, 0xF3),
-                             (0x00, 0x00, 0x00),
-                             (0x00, 0x00, 0x00),
-                             (0x00, 0x00, 0x00)]
+        # Dirty tracking. A frame drawn from the same registers and memory
+        # as the previous one comes out the same, so it is skipped and only
+        # its sprite 0 hit and overflow lines are replayed. Status reads in
+        # the middle of the frame blank the lines above them; clearLine is
+        # the last of those this frame and blankTop the one the picture in
+        # frameBuffer was left with.
+        self.control1 = None
+        self.control2 = None
+        self.dirty = True
+        self.drawing = True
+        self.frameChanged = True
+        self.inFrame = False
+        self.clearLine = 0
+        self.blankTop = 0
+        self.sprite0HitLine = -1
+        self.spriteOverflowLine = -1
+
+        # Scanlines are drawn lazily, nextLine is the first one the CPU has
+        # not caught up with yet
+        self.nextLine = 0
+
+        # Every register access, in order, when something replays them
+        # (see multicore). None when nobody does.
+        self.log = None
+
+        # Colours, and the palette RAM entries resolved to colour indices.
+        # paletteColors only changes with $3F00-$3F1F, and the drawers read
+        # it instead of palette RAM.
+        self.palette = self.console.PALETTE
+        if self.palette is None:
+            self.palette = Palette()
+        self.paletteColors = bytearray(32)
+        self.backgroundPalettes = None
+
+
+        # The picture as colour indices into the palette, one byte per
+        # pixel, row after row. Renderers turn it into RGB once per frame.
+        # Nothing may replace it, the renderers and views hold on to it.
+        self.frameBuffer = bytearray(BLANK_FRAME)
+
+        # Finished frames for whoever reads them straight from here (see
+        # frameIndices): how many there have been, the emphasis and
+        # greyscale bits the last one was shown with, and its RGB, made on
+        # request and at most once per frame
+        self.frameSequence = 0
+        self.frameEmphasis = (0, False)
+        self.rgbBuffer = bytearray(256 * 240 * 3)
+        self.rgbSequence = -1
 
         #try:
         self.renderer = RendererManager(self.console.RENDERER_TYPE)
+        self.renderer.display.setFrameBuffer(self.frameBuffer, self.palette.colors())
         #except:
         #    print ("Cannot initialize Renderer")
 
         self.VBLANK = self.VBlank(self.console)
         self.VRAM = self.VolatileMemory(0x10000)
         self.SPRRAM = self.VolatileMemory(0x100)
+        self.updatePalette()
+
+        # OAM or the sprite size changed since the sprites were last sorted
+        # into scanlines (see evaluateSprites)
+        self.spritesDirty = True
+
+        # Decoded pattern rows, indexed by the address of their low plane
+        # byte, plus their mirror images for flipped sprites. Filled on first
+        # use; only CHR RAM writes ever invalidate them.
+        self.tileRows = [None] * 0x2000
+        self.flippedTileRows = [None] * 0x2000
+        self.chrRam = self.console.cartridge.chrRomCount == 0
+
+        # Cells of the background plane that no longer match VRAM, None
+        # without NumPy (see drawBackgroundPlane), and whether the top and
+        # bottom nametables have any
+        self.staleCells = None
+        self.staleTables = [True, True]
 
         self.load_vram_data()
         self.setMirroring(self.console.cartridge.mirror)
 
+        self.presenter = FramePresenter(self.renderer.display, self.frameBuffer,
+                                        self.palette.colors(), self.console.PRESENT_POLICY)
+
+        # Frames are drawn by a worker process in multi-core mode, this
+        # side only keeps the status flags
+        self.pipeline = None
+        if self.console.THREAD_MODE == "MULTI":
+            from multicore import RenderPipeline
+            self.pipeline = RenderPipeline(self)
+
+        # Whole scanline background pipeline, when NumPy is around
+        self.decodedRows = None
+        if numpy is not None:
+            self.vram = numpy.frombuffer(self.VRAM.ram, dtype=numpy.uint8)
+            self.frame = numpy.frombuffer(self.frameBuffer, dtype=numpy.uint8).reshape(240, 256)
+            self.decodedRows = self.decodeTileRows(0, 0x2000)
+            self.backgroundPlans = {}
+            self.plane = numpy.zeros((480, 512), dtype=numpy.uint8)
+            self.staleCells = numpy.ones((60, 64), dtype=bool)
+            self.planePatternTable = None
+            self.drawBackground = self.drawBackgroundPlane
+
         super(PPU, self).__init__()
 
     def load_vram_data(self):
@@ -163,7 +235,104 @@ class PPU:
         self.ppuMirroring = mirroring
         self.addressMirroring = 0x400 << self.ppuMirroring
 
+    # Draws the scanlines the CPU has gone past since the last call, all in
+    # one go. Has to run before the CPU reads or writes a PPU register, and
+    # at the end of the frame; during VBlank there is nothing to draw.
+    def sync(self):
+        scanline = self.console.CPU.scanline
+        if scanline > 240:
+            return
+        first = self.nextLine
+        if first < scanline:
+            self.nextLine = scanline
+            self.drawLines(first, scanline)
+
+    # Called before anything the picture depends on changes
+    def markDirty(self):
+        self.dirty = True
+        if self.inFrame and not self.drawing:
+            # Bring the lines above up to date while the old state is still
+            # around, then draw the rest of the frame as usual
+            scanline = min(self.console.CPU.scanline, 240)
+            self.catchUp(scanline)
+            self.frameBuffer[scanline * 256:] = BLANK_FRAME[scanline * 256:]
+            self.drawing = True
+            self.frameChanged = True
+            if self.sprite0HitLine >= scanline:
+                self.sprite0HitLine = -1
+            if self.spriteOverflowLine >= scanline:
+                self.spriteOverflowLine = -1
+
+    def clearFrame(self):
+        scanline = min(self.console.CPU.scanline, 240)
+        self.clearLine = scanline
+        if self.drawing:
+            self.frameBuffer[:scanline * 256] = BLANK_FRAME[:scanline * 256]
+
+    def endFrame(self):
+        self.inFrame = False
+        if not self.drawing and self.clearLine != self.blankTop:
+            self.catchUp(240)
+            self.frameChanged = True
+        self.blankTop = self.clearLine
+
+    # A finished frame is in frameBuffer
+    def finishFrame(self):
+        self.frameSequence += 1
+        self.frameEmphasis = (self.colorIntensity, self.colorMode)
+
+    # The last finished frame as colour indices, 240 rows of 256, without a
+    # copy. It is drawn over as soon as the emulation goes on, so anything
+    # kept longer than that has to be copied out.
+    def frameIndices(self):
+        return memoryview(self.frameBuffer).cast('B', (240, 256))
+
+    # The last finished frame as RGB, 240 rows of 256 pixels of 3 bytes, in
+    # the colours it was shown with. The buffer is reused for every frame.
+    def frameRGB(self):
+        if self.rgbSequence != self.frameSequence:
+            packRGB(self.frameBuffer, self.palette.channels(*self.frameEmphasis), self.rgbBuffer)
+            self.rgbSequence = self.frameSequence
+        return memoryview(self.rgbBuffer).cast('B', (240, 256, 3))
+
+    # frameIndices and frameRGB as NumPy arrays, again without a copy
+    def frameIndicesArray(self):
+        if numpy is None:
+            raise Exception('NumPy is not installed')
+        return numpy.frombuffer(self.frameBuffer, dtype=numpy.uint8).reshape(240, 256)
+
+    def frameRGBArray(self):
+        if numpy is None:
+            raise Exception('NumPy is not installed')
+        self.frameRGB()
+        return numpy.frombuffer(self.rgbBuffer, dtype=numpy.uint8).reshape(240, 256, 3)
+
+    # Makes the lines above scanline of a skipped frame look like they were
+    # drawn and cleared this frame. The picture left over has the lines from
+    # blankTop down, the ones between clearLine and blankTop are missing.
+    def catchUp(self, scanline):
+        blank = min(self.clearLine, scanline)
+        self.frameBuffer[:blank * 256] = BLANK_FRAME[:blank * 256]
+
+        flags = (self.sprite0Hit, self.spriteHitOccured, self.spriteOverflow,
+                 self.sprite0HitLine, self.spriteOverflowLine)
+        first = self.clearLine
+        last = min(self.blankTop, scanline)
+        if first < last:
+            if self.showBackground:
+                self.drawBackground(first, last)
+            if self.showSprites:
+                for line in range(first, last):
+                    self.drawSprites(line)
+        (self.sprite0Hit, self.spriteHitOccured, self.spriteOverflow,
+         self.sprite0HitLine, self.spriteOverflowLine) = flags
+
     def processControlReg1(self, value):
+        # Only the name table, pattern tables and sprite size show on screen
+        if value & 0x3B != self.control1:
+            self.markDirty()
+            self.control1 = value & 0x3B
+
         # Check bits 0-1
         aux = value & 0x3
         if aux == 0:
@@ -194,10 +363,10 @@ class PPU:
             self.backgroundPatternTable = 0x0000
 
         # Check bit 5
-        if value & (1 << 5):
-            self.spriteSize = 16
-        else:
-            self.spriteSize = 8
+        spriteSize = 16 if value & (1 << 5) else 8
+        if spriteSize != self.spriteSize:
+            self.spriteSize = spriteSize
+            self.spritesDirty = True
 
         # Bit 6 not used
         # Check bit 7
@@ -207,7 +376,12 @@ class PPU:
             self.NMI = False
 
     def processControlReg2(self, value):
-        # Check bit 0
+        # Background clipping and the show bits
+        if value & 0x1A != self.control2:
+            self.markDirty()
+            self.control2 = value & 0x1A
+
+        # Check bit 0, greyscale
         if value & 1:
             self.colorMode = True
         else:
@@ -237,12 +411,14 @@ class PPU:
         else:
             self.showSprites = False
 
-        # Check bits 5-7
+        # Check bits 5-7, colour emphasis
         self.colorIntensity = value >> 5
 
     # process register 0x2005
     def processPPUSCROLL(self, value):
         if self.firstWrite:
+            if value != self.ppuScrollX:
+                self.markDirty()
             self.ppuScrollX = value
             self.firstWrite = False
         else:
@@ -261,26 +437,55 @@ class PPU:
     # process register 0x2007 (write)
     def writeVRAM(self, value):
         #Todo: Verificar se esta certo
+        address = self.VRAMAddress
+        ram = self.VRAM.ram
+        # Rewriting the same value leaves the picture alone, as long as every
+        # mirror the write lands on already holds it too
         # NameTable write mirroring.
-        if self.VRAMAddress >= 0x2000 and self.VRAMAddress < 0x3F00:
-            self.VRAM.write(self.VRAMAddress + self.addressMirroring, value)
-            self.VRAM.write(self.VRAMAddress, value)
+        if address >= 0x2000 and address < 0x3F00:
+            mirror = address + self.addressMirroring
+            if ram[address] != value or ram[mirror] != value:
+                self.markDirty()
+                if self.staleCells is not None:
+                    self.invalidateCell(mirror, value)
+                    self.invalidateCell(address, value)
+            self.VRAM.write(mirror, value)
+            self.VRAM.write(address, value)
+        # CHR RAM, on cartridges without CHR ROM
+        elif address < 0x2000 and self.chrRam:
+            if ram[address] != value:
+                self.markDirty()
+            self.VRAM.write(address, value)
+            self.invalidateTileRow(address)
         # Color Pallete write mirroring.
-        elif self.VRAMAddress >= 0x3F00 and self.VRAMAddress < 0x3F20:
-            if self.VRAMAddress == 0x3F00 or self.VRAMAddress == 0x3F10:
-                self.VRAM.write(0x3F00, value)
-                self.VRAM.write(0x3F04, value)
-                self.VRAM.write(0x3F08, value)
-                self.VRAM.write(0x3F0C, value)
-                self.VRAM.write(0x3F10, value)
-                self.VRAM.write(0x3F14, value)
-                self.VRAM.write(0x3F18, value)
-                self.VRAM.write(0x3F1C, value)
+        elif address >= 0x3F00 and address < 0x3F20:
+            if address == 0x3F00 or address == 0x3F10:
+                entries = BACKDROP_ENTRIES
             else:
-                self.VRAM.write(self.VRAMAddress, value)
+                entries = (address,)
+            changed = any(ram[entry] != value for entry in entries)
+            if changed:
+                self.markDirty()
+                # Every cell is drawn with the background palettes
+                if self.staleCells is not None and address <= 0x3F10:
+                    self.invalidatePlane()
+            for entry in entries:
+                self.VRAM.write(entry, value)
+            if changed:
+                self.updatePalette()
 
         self.VRAMAddress += self.incrementAddress
 
+    # Brings the palette RAM lookups up to date with $3F00-$3F1F
+    def updatePalette(self):
+        colors = self.paletteColors
+        ram = self.VRAM.ram
+        for i in range(32):
+            colors[i] = ram[0x3F00 + i] & 0x3F
+        # Colour index of the 4 pixel values under each background palette,
+        # as bytes.translate tables
+        self.backgroundPalettes = [bytes(colors[p << 2:(p << 2) + 4]) + bytes(252) for p in range(4)]
+
     # process register 0x2007 (read)
     def readVRAM(self):
         value = 0
@@ -297,22 +502,33 @@ class PPU:
         return value
 
     def writeSprRam(self, value):
-        self.SPRRAM.write(self.spriteRamAddr,value)
+        if self.SPRRAM.ram[self.spriteRamAddr] != value:
+            self.markDirty()
+            self.SPRRAM.write(self.spriteRamAddr,value)
+            self.spritesDirty = True
         self.spriteRamAddr = (self.spriteRamAddr + 1) & 0xFF
 
-    def writeSprRamDMA(self, value):
-        address = value * 0x100
-
+    def writeSprRamDMA(self, page):
+        # Most games copy the same table every frame
+        ram = self.SPRRAM.ram
         i = 0
         while i < 256:
-            self.SPRRAM.write(i, self.console.CPU.RAM.read(address))
-            address += 1
+            if ram[i] != page[i]:
+                break
             i += 1
+        if i == 256:
+            return
+
+        self.markDirty()
+        while i < 256:
+            self.SPRRAM.write(i, page[i])
+            i += 1
+        self.spritesDirty = True
 
     def readStatusFlag(self):
         value = 0
         value |= (self.vRamWrites << 4)
-        value |= (self.scanlineSpriteCount << 5)
+        value |= (int(self.spriteOverflow) << 5)
         value |= (self.sprite0Hit << 6)
         value |= (int(self.VBLANK.status) << 7)
 
@@ -321,16 +537,84 @@ class PPU:
 
         return value
 
-    def doScanline(self):
-
+    # Register number is the address & 0xF, as the CPU decodes it
+    def readRegister(self, register):
+        if register == 2:
+            return self.readStatusFlag()
+        elif register == 7:
+            return self.readVRAM()
+        return 0x00
+
+    def writeRegister(self, register, value):
+        if register == 0:
+            self.processControlReg1(value)
+        elif register == 1:
+            self.processControlReg2(value)
+        elif register == 3:
+            self.spriteRamAddr = value
+        elif register == 4:
+            self.writeSprRam(value)
+        elif register == 5:
+            self.processPPUSCROLL(value)
+        elif register == 6:
+            self.processPPUADDR(value)
+        elif register == 7:
+            self.writeVRAM(value)
+
+    # Visible lines are left to sync, VBlank starts when line 240 ends
+    def endScanline(self, scanline):
+        if self.VBLANK.status:
+            self.VBLANK.exit()
+        if scanline == 240 and not self.VBLANK.status:
+            self.VBLANK.enter()
+
+    # Scanlines first..last-1, which all see the same registers and memory
+    def drawLines(self, first, last):
+        # Sprite 0 hit and overflow hold until the next frame starts
+        if first == 0:
+            self.sprite0Hit = 0
+            self.spriteHitOccured = False
+            self.spriteOverflow = False
+            self.inFrame = True
+            self.clearLine = 0
+
+        if self.pipeline is not None:
+            if self.showSprites:
+                for scanline in range(first, last):
+                    self.checkSprites(scanline)
+            return
+
+        if first == 0:
+            self.drawing = self.dirty
+            self.frameChanged = self.dirty
+            self.dirty = False
+            if self.drawing:
+                self.frameBuffer[:] = BLANK_FRAME
+                self.sprite0HitLine = -1
+                self.spriteOverflowLine = -1
+
+        if not self.drawing:
+            if first <= self.sprite0HitLine < last:
+                self.sprite0Hit = True
+                self.spriteHitOccured = True
+            if first <= self.spriteOverflowLine < last:
+                self.spriteOverflow = True
+            return
+
+        # Sprites only ever cover their own line, so the background of all
+        # the lines can go first
         if self.showBackground:
-            self.drawBackground(self.console.CPU.scanline)
+            self.drawBackground(first, last)
 
         if self.showSprites:
-            self.drawSprites(self.console.CPU.scanline)
-            
+            for scanline in range(first, last):
+                self.drawSprites(scanline)
+
+    def drawBackground(self, first, last):
+        for scanline in range(first, last):
+            self.drawBackgroundLine(scanline)
 
-    def drawBackground(self, scanline):
+    def drawBackgroundLine(self, scanline):
         tileY = int(scanline / 8)
         Y = int(scanline % 8)
 
@@ -341,6 +625,12 @@ class PPU:
         currentTile = int(self.ppuScrollX / 8)
         v = int(self.nameTableAddress + currentTile)
         pixel = 0
+        frameBuffer = self.frameBuffer
+        row = scanline * 256
+        tileRows = self.tileRows
+        patternRow = self.backgroundPatternTable + Y
+
+        palettes = self.backgroundPalettes
 
         first = 0 if self.clippingBackground else 1
         tiles = array('B', list(range(first, maxTiles)))
@@ -357,40 +647,36 @@ class PPU:
                     fromByte = 8 - (ppuScrollFlag)
 
             ptrAddress = self.VRAM.read(v + int(tileY*0x20))
-            pattern1 = self.VRAM.read(self.backgroundPatternTable + (ptrAddress*16) + Y)
-            pattern2 = self.VRAM.read(self.backgroundPatternTable + (ptrAddress*16) + Y + 8)
+            pixels = tileRows[patternRow + (ptrAddress*16)]
+            if pixels is None:
+                pixels = self.cacheTileRow(patternRow + (ptrAddress*16))
             # blockX e blockY sao as coordenadas em relacao ao block
-            blockX = i % 4
+            column = v & 0x1F
+            blockX = column % 4
             blockY = tileY % 4
-            block = int(i / 4) + (int(tileY / 4) * 8)
+            block = int(column / 4) + (int(tileY / 4) * 8)
             addressByte = int((v & ~0x001F) + 0x03C0 + block)
             byteAttributeTable = self.VRAM.read(addressByte)
-            colorIndex = 0x3F00
 
             if blockX < 2:
                 if blockY >= 2:
-                    colorIndex |= ((byteAttributeTable & 0b110000) >> 4) << 2
+                    palette = palettes[(byteAttributeTable & 0b110000) >> 4]
                 else:
-                    colorIndex |= (byteAttributeTable & 0b11) << 2
+                    palette = palettes[byteAttributeTable & 0b11]
             elif blockX >= 2 and blockY < 2:
-                colorIndex |= ((byteAttributeTable & 0b1100) >> 2) << 2
+                palette = palettes[(byteAttributeTable & 0b1100) >> 2]
             else:
-                colorIndex |= ((byteAttributeTable & 0b11000000) >> 6) << 2
-
-            k = array('B', list(range(fromByte, toByte)))
-            for j in k:
-                bit1 = ((1 << j) & pattern1) >> j
-                bit2 = ((1 << j) & pattern2) >> j
-                colorIndexFinal = colorIndex
-                colorIndexFinal |= ((bit2 << 1) | bit1)
-
-                color = self.colorPallete[self.VRAM.read(colorIndexFinal)]
-                x = (pixel + ((j * (-1)) + (toByte - fromByte) - 1))
-                y = scanline
+                palette = palettes[(byteAttributeTable & 0b11000000) >> 6]
 
-                if (bytes(color) != self.renderer.display.LAYER_B.read(x, y)):
-                    self.renderer.display.LAYER_B.write(x, y, color)
-                j += 1
+            if fromByte == 0 and toByte == 8 and pixel <= 248:
+                frameBuffer[row + pixel:row + pixel + 8] = pixels.translate(palette)
+            else:
+                # Pixel j of the partial tile lands at pixel + (width - 1 - j)
+                width = toByte - fromByte
+                for j in range(fromByte, toByte):
+                    x = pixel + width - 1 - j
+                    if 0 <= x < 256:
+                        frameBuffer[row + x] = palette[pixels[7 - j]]
 
             pixel += toByte - fromByte
 
@@ -400,88 +686,266 @@ class PPU:
                 v ^= 0x400
             else:
                 v += 1
-            del k
         del tiles
 
-    def drawSprites(self, scanline):
-        numberSpritesPerScanline = 0
-        Y = scanline % 8
-        secondaryOAM = array('B', [0xFF] * 32)
-        indexSecondaryOAM = 0
-
-        k = array('B', list(range(0, 256, 4)))
-        for currentSprite in k:
-            spriteY = self.SPRRAM.read(currentSprite)
-
-            if numberSpritesPerScanline == 8:
-                break
+    # Splits the pattern row at address (low plane, high plane 8 bytes on)
+    # into its 8 pixel values, left to right
+    def decodeTileRow(self, address):
+        low = self.VRAM.read(address)
+        high = self.VRAM.read(address + 8)
+        return bytes(((low >> (7 - i)) & 1) | (((high >> (7 - i)) & 1) << 1) for i in range(8))
+
+    def cacheTileRow(self, address):
+        pixels = self.decodeTileRow(address)
+        self.tileRows[address] = pixels
+        self.flippedTileRows[address] = pixels[::-1]
+        return pixels
+
+    # A pattern byte is the low plane of one row and the high plane of the
+    # row 8 bytes before it
+    def invalidateTileRow(self, address):
+        self.tileRows[address] = None
+        self.flippedTileRows[address] = None
+        if self.staleCells is not None:
+            self.invalidatePlane()
+        if address >= 8:
+            self.tileRows[address - 8] = None
+            self.flippedTileRows[address - 8] = None
+        if self.decodedRows is not None:
+            first = max(address - 8, 0)
+            self.decodedRows[first:address + 1] = self.decodeTileRows(first, address + 1)
+
+    # decodeTileRow for the rows first..last-1 at once, one row of 8 pixel
+    # values per address
+    def decodeTileRows(self, first, last):
+        bits = numpy.arange(7, -1, -1, dtype=numpy.uint8)
+        low = self.vram[first:last, None]
+        high = self.vram[first + 8:last + 8, None]
+        return ((low >> bits) & 1) | (((high >> bits) & 1) << 1)
+
+    # Where drawBackgroundLine puts each pixel for a fine X scroll and
+    # clipping setting: the x positions written and, for each, the pixel it
+    # takes from the tiles laid out one after the other. Later tiles win
+    # where they overlap, as they do in the loop.
+    def backgroundPlan(self, fineX, first):
+        maxTiles = 33 if fineX else 32
+        sources = {}
+        pixel = 0
+        for i in range(first, maxTiles):
+            fromByte = 0
+            toByte = 8
+            if fineX:
+                if i == 0:
+                    toByte = 7 - fineX
+                if i == (maxTiles - 1):
+                    fromByte = 8 - fineX
+            width = toByte - fromByte
+            for j in range(fromByte, toByte):
+                x = pixel + width - 1 - j
+                if 0 <= x < 256:
+                    sources[x] = (i - first) * 8 + 7 - j
+            pixel += width
+
+        positions = sorted(sources)
+        plan = (numpy.array(positions, dtype=numpy.intp),
+                numpy.array([sources[x] for x in positions], dtype=numpy.intp))
+        self.backgroundPlans[(fineX, first)] = plan
+        return plan
+
+    # Marks the plane cells a nametable write at address changes: its own
+    # cell, or for an attribute byte the 2x2 cell quadrants whose palette
+    # bits change
+    def invalidateCell(self, address, value):
+        if not 0x2000 <= address < 0x3000:
+            return
+        old = self.VRAM.ram[address]
+        if old == value:
+            return
+        table = (address >> 10) & 3
+        offset = address & 0x3FF
+        self.staleTables[table >> 1] = True
+        top = (table >> 1) * 30
+        left = (table & 1) * 32
+        if offset < 0x3C0:
+            self.staleCells[top + (offset >> 5), left + (offset & 0x1F)] = True
+            return
+        offset -= 0x3C0
+        top += (offset >> 3) * 4
+        left += (offset & 7) * 4
+        changed = old ^ value
+        for quadrant in range(4):
+            if changed & (3 << (quadrant * 2)):
+                y = top + (quadrant >> 1) * 2
+                x = left + (quadrant & 1) * 2
+                # The last attribute row only covers half a row of blocks
+                if y < (table >> 1) * 30 + 30:
+                    self.staleCells[y:y + 2, x:x + 2] = True
+
+    def invalidatePlane(self):
+        self.staleCells[:] = True
+        self.staleTables = [True, True]
+
+    # Draws the stale cells of the nametables at plane rows top..top+29 into
+    # the plane, the four nametables laid out 2x2 like their addresses
+    def refreshPlane(self, top):
+        if self.planePatternTable != self.backgroundPatternTable:
+            self.planePatternTable = self.backgroundPatternTable
+            self.invalidatePlane()
+        if not self.staleTables[top // 30]:
+            return
+        self.staleTables[top // 30] = False
+        stale = self.staleCells[top:top + 30]
+        cellY, cellX = numpy.nonzero(stale)
+        if not len(cellY):
+            return
+        stale[:] = False
+        vram = self.vram
+
+        base = 0x2000 | ((top // 30) << 11) | ((cellX >> 5) << 10)
+        column = cellX & 0x1F
+        tiles = vram[base + (cellY << 5) + column].astype(numpy.intp)
+        attributes = vram[base + 0x3C0 + ((cellY >> 2) << 3) + (column >> 2)]
+        shift = ((column & 3) >= 2) * 2 + ((cellY & 3) >= 2) * 4
+        palettes = (attributes >> shift) & 3
+        colors = numpy.frombuffer(self.paletteColors, dtype=numpy.uint8)[:16]
+
+        pixels = self.decodedRows[self.backgroundPatternTable + (tiles << 4)[:, None] + TILE_PIXELS]
+        blocks = colors[(palettes << 2)[:, None, None] + pixels]
+        self.plane.reshape(60, 8, 64, 8)[top + cellY, :, cellX, :] = blocks
+
+    # Same picture as drawBackgroundLine, lines first..last-1 cut out of the
+    # plane in one go. Tiles wrap into the nametable to the right, and the
+    # Y scroll is not used, as in drawBackgroundLine.
+    def drawBackgroundPlane(self, first, last):
+        clip = 0 if self.clippingBackground else 1
+        fineX = self.ppuScrollX & 7
+        plan = self.backgroundPlans.get((fineX, clip))
+        if plan is None:
+            plan = self.backgroundPlan(fineX, clip)
+        positions, sources = plan
+
+        table = (self.nameTableAddress >> 10) & 3
+        top = (table >> 1) * 30
+        self.refreshPlane(top)
+        left = (table & 1) * 256 + (self.ppuScrollX & ~7)
+        rows = self.plane[top * 8 + first:top * 8 + last]
+        self.frame[first:last, positions] = rows[:, (left + sources) & 511]
+
+    # Splits OAM into per scanline lists of at most 8 sprites, in OAM order.
+    # A scanline with more sprites in range gets its overflow flag instead.
+    def evaluateSprites(self):
+        buckets = [[] for _ in range(240)]
+        overflow = bytearray(240)
+        ram = self.SPRRAM.ram
+        for currentSprite in range(0, 256, 4):
+            spriteY = ram[currentSprite]
+            for scanline in range(spriteY, min(spriteY + self.spriteSize, 240)):
+                if len(buckets[scanline]) < 8:
+                    buckets[scanline].append(currentSprite)
+                else:
+                    overflow[scanline] = 1
 
-            if spriteY <= scanline < spriteY + self.spriteSize:
-                sprloop = array('B', list(range(4)))
-                for i in sprloop:
-                    secondaryOAM[indexSecondaryOAM + i] = self.SPRRAM.read(currentSprite+i)
-                indexSecondaryOAM += 4
-                numberSpritesPerScanline += 1
-                del sprloop
-        del k
+        self.spriteBuckets = buckets
+        self.spriteOverflowLines = overflow
+        self.spritesDirty = False
 
-        k = array('B', list(range(28, -1, -4)))
-        for currentSprite in k:
-            spriteX = secondaryOAM[currentSprite + 3]
-            spriteY = secondaryOAM[currentSprite]
+    def drawSprites(self, scanline):
+        if self.spritesDirty:
+            self.evaluateSprites()
+        if self.spriteOverflowLines[scanline]:
+            self.spriteOverflow = True
+            if self.spriteOverflowLine < 0:
+                self.spriteOverflowLine = scanline
+
+        ram = self.SPRRAM.ram
+        bucket = self.spriteBuckets[scanline]
+        colors = self.paletteColors
+        # Pixels the same colour as $3F10 are see-through
+        keys = self.palette.keys
+        transparent = keys[colors[0x10]]
+        frameBuffer = self.frameBuffer
+        row = scanline * 256
+        # Last in OAM order first, so earlier sprites end up on top
+        for slot in range(len(bucket) - 1, -1, -1):
+            sprite = bucket[slot]
+            spriteX = ram[sprite + 3]
+            spriteY = ram[sprite]
 
             if spriteY >= 0xEF or spriteX >= 0xF9:
                 continue
 
-            currentSpriteAddress = currentSprite + 2
-            flipVertical = secondaryOAM[currentSpriteAddress] & 0x80
-            flipHorizontal = secondaryOAM[currentSpriteAddress] & 0x40
-
-            Y = scanline - spriteY
-
-            ptrAddress = secondaryOAM[currentSprite + 1]
-            patAddress = self.spritePatternTable + (ptrAddress * 16) + ((7 - Y) if flipVertical else Y)
-            pattern1 = self.VRAM.read(patAddress)
-            pattern2 = self.VRAM.read(patAddress + 8)
-            colorIndex = 0x3F10
+            pixels = self.spriteRow(sprite, scanline)
+            palette = self.spritePalette(ram[sprite + 2])
 
-            colorIndex |= ((secondaryOAM[currentSprite +2] & 0x3) << 2)
-
-            sprloop = array('B', range(8))
-            for j in sprloop:
-                if flipHorizontal:
-                    colorIndexFinal = (pattern1 >> j) & 0x1
-                    colorIndexFinal |= ((pattern2 >> j) & 0x1 ) << 1
-                else:
-                    colorIndexFinal = (pattern1 >> (7 - j)) & 0x1
-                    colorIndexFinal |= ((pattern2 >> (7 - j)) & 0x1) << 1
-
-                colorIndexFinal += colorIndex
-                if (colorIndexFinal % 4) == 0:
-                    colorIndexFinal = 0x3F00
-                color = self.colorPallete[(self.VRAM.read(colorIndexFinal) & 0x3F)]
+            for j in range(8):
+                color = palette[pixels[j]]
 
                 # Add Transparency
-                if color == self.colorPallete[self.VRAM.read(0x3F10)]:
-                    color += (0,)
+                if keys[color] == transparent:
+                    continue
 
-                self.renderer.display.LAYER_A.write(spriteX + j, spriteY + Y, color)
-                checkColor=self.renderer.display.LAYER_A.read(spriteX + j, spriteY + Y)
-                if self.showBackground and not(self.spriteHitOccured) and currentSprite == 0 and checkColor == bytes(color):
+                frameBuffer[row + spriteX + j] = color
+                if self.showBackground and not(self.spriteHitOccured) and slot == 0:
                     self.sprite0Hit = True
                     self.spriteHitOccured = True
-            del sprloop
-        del k
+                    self.sprite0HitLine = scanline
+
+    # Colour index of the 4 pixel values of a sprite with these attributes.
+    # Value 0 takes the universal background colour.
+    def spritePalette(self, attributes):
+        colors = self.paletteColors
+        select = 0x10 | ((attributes & 0x3) << 2)
+        return (colors[0], colors[select + 1], colors[select + 2], colors[select + 3])
+
+    # Pixel values of the row of sprite that falls on scanline
+    def spriteRow(self, sprite, scanline):
+        ram = self.SPRRAM.ram
+        flipVertical = ram[sprite + 2] & 0x80
+        flipHorizontal = ram[sprite + 2] & 0x40
+
+        Y = scanline - ram[sprite]
+
+        ptrAddress = ram[sprite + 1]
+        patAddress = self.spritePatternTable + (ptrAddress * 16) + ((7 - Y) if flipVertical else Y)
+        # Rows near the end of the pattern tables read their high plane
+        # from outside CHR, those are never cached
+        if 0 <= patAddress < 0x1FF8:
+            rows = self.flippedTileRows if flipHorizontal else self.tileRows
+            pixels = rows[patAddress]
+            if pixels is None:
+                self.cacheTileRow(patAddress)
+                pixels = rows[patAddress]
+        else:
+            pixels = self.decodeTileRow(patAddress)
+            if flipHorizontal:
+                pixels = pixels[::-1]
+        return pixels
+
+    # The flags drawSprites would raise on scanline, without drawing it.
+    # Used when the picture is drawn by the render worker.
+    def checkSprites(self, scanline):
+        if self.spritesDirty:
+            self.evaluateSprites()
+        if self.spriteOverflowLines[scanline]:
+            self.spriteOverflow = True
+
+        bucket = self.spriteBuckets[scanline]
+        if not bucket or not self.showBackground or self.spriteHitOccured:
+            return
+        ram = self.SPRRAM.ram
+        sprite = bucket[0]
+        if ram[sprite] >= 0xEF or ram[sprite + 3] >= 0xF9:
+            return
+
+        pixels = self.spriteRow(sprite, scanline)
+        palette = self.spritePalette(ram[sprite + 2])
+        keys = self.palette.keys
+        transparent = keys[self.paletteColors[0x10]]
+        for j in range(8):
+            if keys[palette[pixels[j]]] != transparent:
+                self.sprite0Hit = True
+                self.spriteHitOccured = True
+                return
 
     def run(self):
         print("PPU OK")
-        if self.console.THREAD_MODE == "SINGLE":
-            pass
-        else:
-            self.console.CPU = self.console.CPU
-            while True:
-                self.console.CPU.end.wait()
-                self.console.CPU.end.clear()
-                print(self.console.CPU.scanline)
-                self.renderer.display.blit()
-                self.console.CPU.scanline = 0
@@ -0,0 +1,113 @@
+import queue
+import threading
+
+
+# How finished frames get to the window.
+#   latest: a presenter thread shows them; when it falls behind, the oldest
+#           waiting frame is dropped, so the emulation never waits on it
+#   strict: a presenter thread shows every frame; the emulation waits when
+#           the queue is full
+#   inline: the emulation thread shows them itself, in step with the frames
+#           (batch runs, and renderers bound to the thread that made them)
+PRESENT_POLICIES = ("latest", "strict", "inline")
+
+# Frames waiting for the presenter thread
+QUEUE_DEPTH = 2
+
+
+class FramePresenter:
+    def __init__(self, display, frameBuffer, palette, policy="latest"):
+        if policy not in PRESENT_POLICIES:
+            raise Exception('Unknown present policy ' + policy)
+        self.display = display
+        self.frameBuffer = frameBuffer
+        self.policy = policy
+        # Colours of the last frame handed over
+        self.colors = palette
+        # Status line shown over the next frame, and the one shown over the
+        # last frame presented
+        self.message = None
+        self.shownMessage = None
+        self.presented = 0
+        self.dropped = 0
+        self.error = None
+        self.thread = None
+        if policy == "inline":
+            return
+
+        # The display gets a buffer of its own, which only the presenter
+        # thread writes, so the PPU can go on with the next frame
+        self.screen = bytearray(frameBuffer)
+        display.setFrameBuffer(self.screen, palette)
+        self.frames = queue.Queue(QUEUE_DEPTH)
+        self.thread = threading.Thread(target=self.run, name="presenter", daemon=True)
+        self.thread.start()
+
+    def text(self, message):
+        self.message = message
+        if self.thread is None:
+            self.display.DEBUG_LAYER.text(message)
+
+    def clear(self):
+        self.message = None
+        if self.thread is None:
+            self.display.clear()
+
+    # Whether the status line changed since the last frame was presented
+    def textChanged(self):
+        return self.message != self.shownMessage
+
+    # Called at VBlank with the finished frame in frameBuffer, and the
+    # colours to show it in
+    def present(self, colors):
+        self.shownMessage = self.message
+        if self.thread is None:
+            if colors is not self.colors:
+                self.display.setPalette(colors)
+                self.colors = colors
+            self.display.blit()
+            self.presented += 1
+            return
+
+        if self.error is not None:
+            raise Exception('Presenter stopped') from self.error
+        frame = (bytes(self.frameBuffer), self.message, colors)
+        self.colors = colors
+        if self.policy == "strict":
+            while True:
+                try:
+                    self.frames.put(frame, timeout=1)
+                    return
+                except queue.Full:
+                    if self.error is not None:
+                        raise Exception('Presenter stopped') from self.error
+        while True:
+            try:
+                self.frames.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    # The presenter thread. Everything it does with the display happens here,
+    # none of it in the emulation thread.
+    def run(self):
+        display = self.display
+        shown = self.colors
+        try:
+            while True:
+                frame, message, colors = self.frames.get()
+                if colors is not shown:
+                    display.setPalette(colors)
+                    shown = colors
+                display.clear()
+                if message is not None:
+                    display.DEBUG_LAYER.text(message)
+                self.screen[:] = frame
+                display.blit()
+                self.presented += 1
+        except Exception as error:
+            self.error = error
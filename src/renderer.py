@@ -1,13 +1,18 @@
-from renderers.pygame import PygameRenderer
-from renderers.ncurse import NcurseRenderer
-from renderers.pyglet import PygletRenderer
-
-
 class RendererManager:
     def __init__(self, renderer="pygame"):
+        # Backends are imported on demand, so a headless run never loads
+        # the windowing libraries
         if renderer == "pygame":
+            from renderers.pygame import PygameRenderer
             self.display = PygameRenderer()
         elif renderer == "pyglet":
+            from renderers.pyglet import PygletRenderer
             self.display = PygletRenderer()
         elif renderer == "ncurse":
-            self.display = NcurseRenderer()
\ No newline at end of file
+            from renderers.ncurse import NcurseRenderer
+            self.display = NcurseRenderer()
+        elif renderer == "null" or renderer == "headless":
+            from renderers.null import NullRenderer
+            self.display = NullRenderer()
+        else:
+            raise Exception('Unknown renderer ' + renderer)
@@ -1 +1 @@
-__all__ = ["pygame", "ncurse", "pyglet"]
\ No newline at end of file
+__all__ = ["pygame", "ncurse", "pyglet", "null"]
\ No newline at end of file
@@ -49,6 +49,13 @@ class NcurseRenderer:
            print ("Initialize Video Error with Ncurse as Renderer")
         super(NcurseRenderer, self).__init__()
     
+    def setFrameBuffer(self, frameBuffer, palette):
+        self.frameBuffer = frameBuffer
+        self.setPalette(palette)
+
+    def setPalette(self, palette):
+        self.palette = palette
+
     def main(self, screen):
         self.SCREEN = screen   
         self.reset()
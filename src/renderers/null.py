@@ -0,0 +1,44 @@
+# Keeps the frame in memory and never opens a window, for batch runs on
+# machines without a display
+
+from palette import channelTables, packRGB
+
+
+class NullRenderer:
+    class AlphaLayer:
+        def clear(self):
+            pass
+
+        def text(self, message=""):
+            pass
+
+    def __init__(self):
+        self.layers = ["DEBUG_LAYER"]
+
+        self.DEBUG_LAYER = NullRenderer.AlphaLayer()
+        self.frameBuffer = None
+        self.frames = 0
+
+    def setFrameBuffer(self, frameBuffer, palette):
+        self.frameBuffer = frameBuffer
+        self.setPalette(palette)
+        self.reset()
+
+    def setPalette(self, palette):
+        self.channels = channelTables(palette)
+
+    def reset(self):
+        self.clear()
+        self.blit()
+
+    def clear(self):
+        for name in self.layers:
+            getattr(self, name).clear()
+
+    def blit(self):
+        self.frames += 1
+
+    # Flat RGB bytes of the current frame. Only built on request, since most
+    # batch runs never look at the picture.
+    def screen(self):
+        return bytes(packRGB(self.frameBuffer, self.channels))
@@ -2,30 +2,6 @@ import pygame
 from pygame import gfxdraw
 
 class PygameRenderer:
-    class NormalLayer:
-        def __init__(self):
-            self.layer = pygame.Surface((256,240))
-            matrix = pygame.PixelArray(self.layer)
-            matrix[:] = (255, 0, 0)
-            del matrix            
-
-        def clear(self):
-            matrix = pygame.PixelArray(self.layer)
-            matrix[:] = (0, 0, 0)
-            del matrix
-
-        def blit(self, element=None, position=(0,0), color=(0,0,0)):
-            self.layer.blit(element, position, color)
-
-        def read(self, x, y):
-            matrix = pygame.PixelArray(self.layer)
-            value = matrix[x,y]
-            del matrix
-            return value
-
-        def write(self, x, y, value):
-            gfxdraw.pixel(self.layer, x, y, value)
-
     class AlphaLayer:
         def __init__(self):
             self.layer = pygame.Surface((256,240), pygame.SRCALPHA) 
@@ -56,19 +32,28 @@ class PygameRenderer:
             gfxdraw.pixel(self.layer, x, y, value)
 
     def __init__(self):
-        self.layers = ["LAYER_B", "LAYER_A", "DEBUG_LAYER"]
+        self.layers = ["DEBUG_LAYER"]
 
         #try:
         pygame.init()   
         self.SCREEN = pygame.display.set_mode((256, 240))
-        self.LAYER_B = PygameRenderer.NormalLayer()
-        self.LAYER_A = PygameRenderer.AlphaLayer()
+        # 8 bit surface the frame buffer is copied into, its palette does
+        # the conversion to RGB during the blit
+        self.FRAME = pygame.Surface((256, 240), depth=8)
         self.DEBUG_LAYER = PygameRenderer.AlphaLayer()
-        self.reset()
+        self.frameBuffer = None
         #except:
         #   print ("Initialize Video Error with Pygame as Renderer")
         super(PygameRenderer, self).__init__()
 
+    def setFrameBuffer(self, frameBuffer, palette):
+        self.frameBuffer = frameBuffer
+        self.setPalette(palette)
+        self.reset()
+
+    def setPalette(self, palette):
+        self.FRAME.set_palette(palette)
+
     def reset(self):
         self.clear()
         self.blit()
@@ -83,6 +68,9 @@ class PygameRenderer:
             i+=1
 
     def blit(self):
+        if self.frameBuffer is not None:
+            self.FRAME.get_buffer().write(bytes(self.frameBuffer))
+            self.SCREEN.blit(self.FRAME, (0,0))
         tl = self.layers.__len__()
         i=0
         while i < tl:
@@ -91,4 +79,3 @@ class PygameRenderer:
             del l
             i+=1
         pygame.display.update()
-        
\ No newline at end of file
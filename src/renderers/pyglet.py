@@ -2,6 +2,7 @@
 import pyglet
 from pyglet.gl import *
 import numpy as np
+from palette import channelTables, packRGB
 
 class PygletRenderer:
     class NormalLayer:
@@ -66,6 +67,13 @@ class PygletRenderer:
            #print ("Initialize Video Error with Pygame as Renderer")
         super(PygletRenderer, self).__init__()
 
+    def setFrameBuffer(self, frameBuffer, palette):
+        self.frameBuffer = frameBuffer
+        self.setPalette(palette)
+
+    def setPalette(self, palette):
+        self.channels = channelTables(palette)
+
     def reset(self):
         self.clear()
         self.blit()
@@ -81,7 +89,9 @@ class PygletRenderer:
         #self.SCREEN.clear()
 
     def blit(self):
-        self.LAYER_B.blit(0,0,0)
+        # Rows go bottom up in pyglet, hence the negative pitch
+        rgb = bytes(packRGB(self.frameBuffer, self.channels))
+        self.LAYER_B.layer = pyglet.image.ImageData(256, 240, "RGB", rgb, -256 * 3)
         self.LAYER_B.layer.blit(0,0,0)
         self.SCREEN.flip()
         #self.LAYER_A.blit(0,0,-0.1)
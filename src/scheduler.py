@@ -0,0 +1,31 @@
+import heapq
+import sys
+
+
+# Timed events on the CPU cycle timeline. The CPU runs freely until the
+# earliest deadline and only then hands control back here, so nothing has
+# to be counted or checked per instruction besides the cycles themselves.
+class Scheduler:
+    def __init__(self):
+        # Cycles since power on
+        self.now = 0
+        # (time, order, callback) entries, the earliest on top
+        self.events = []
+        self.order = 0
+        self.deadline = sys.maxsize
+
+    # Calls callback once delay more cycles have gone by. Events due on the
+    # same cycle run in the order they were scheduled.
+    def schedule(self, delay, callback):
+        self.order += 1
+        heapq.heappush(self.events, (self.now + delay, self.order, callback))
+        self.deadline = self.events[0][0]
+
+    # Runs everything due by now. An instruction is never split, so events
+    # usually fire a few cycles late, and now is the time they actually ran.
+    def runDue(self):
+        events = self.events
+        while events and events[0][0] <= self.now:
+            callback = heapq.heappop(events)[2]
+            callback()
+        self.deadline = events[0][0] if events else sys.maxsize